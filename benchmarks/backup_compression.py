@@ -0,0 +1,47 @@
+"""
+Compares the throughput of toolboxy.backup writing compressed archives with a
+single compression thread and with one thread per core.
+
+Usage: python benchmarks/backup_compression.py [directory] [level]
+"""
+import os
+import sys
+import tempfile
+
+import toolboxy
+
+
+def sample_tree(root: str, size: int = 256 * 1048576):
+    """Creates a tree with partially compressible files of `size` bytes."""
+    line = b'2023-01-01 12:00:00 INFO toolboxy request served in 12 ms\n'
+    for n in range(16):
+        with open(os.path.join(root, f'file_{n}.log'), 'wb') as f:
+            for _ in range(size // 16 // 1048576):
+                f.write(line * (524288 // len(line)) + os.urandom(524288))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp:
+        source = sys.argv[1] if len(sys.argv) > 1 else ''
+        level = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        if not source:
+            source = os.path.join(temp, 'source')
+            os.makedirs(source)
+            sample_tree(source)
+
+        print(f'{"compression":<12}{"workers":>8}{"MB/s":>10}{"ratio":>8}')
+        for compression in ('gz', 'xz'):
+            for workers in (1, os.cpu_count()):
+                summary = toolboxy.backup(source,
+                                          output_path=temp,
+                                          backup_name=f'{compression}{workers}',
+                                          workers=workers,
+                                          compression=compression,
+                                          level=level)
+                print(f'{compression:<12}{workers:>8}'
+                      f'{summary["throughput"] / 1e6:>10.1f}'
+                      f'{summary["compressed"] / summary["bytes"]:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
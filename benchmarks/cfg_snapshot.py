@@ -0,0 +1,53 @@
+"""
+Compares the startup cost of toolboxy.read_cfg parsing a configuration file
+(cold parse) with loading its binary snapshot (read_cfg(..., snapshot=True)),
+for files with 10, 1k and 100k options.
+
+Usage: python benchmarks/cfg_snapshot.py [repetitions]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import toolboxy
+
+
+def best_time(func, *args, repetitions: int = 5, **kwargs) -> float:
+    """Returns the best wall-clock time of `repetitions` calls, in seconds."""
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f'{"options":>9}{"parse (ms)":>14}{"snapshot (ms)":>16}{"speedup":>10}')
+    with tempfile.TemporaryDirectory() as temp:
+        for options in (10, 1000, 100000):
+            path = os.path.join(temp, f'config_{options}.cfg')
+            toolboxy.create_cfg(
+                path, {
+                    f'section_{s}': {
+                        f'option_{o}': f'value {s}.{o}'
+                        for o in range(min(options, 10))
+                    }
+                    for s in range(max(options // 10, 1))
+                })
+
+            parse = best_time(toolboxy.read_cfg, path, repetitions=repetitions)
+            toolboxy.read_cfg(path, snapshot=True)
+            load = best_time(toolboxy.read_cfg,
+                             path,
+                             snapshot=True,
+                             repetitions=repetitions)
+            print(f'{options:>9}{parse * 1000:>14.2f}{load * 1000:>16.2f}'
+                  f'{parse / load:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Compares the parser backends of toolboxy.html2txt (BeautifulSoup, lxml.html
+and html.parser) in both output modes, reporting pages per second and the
+peak memory of a process converting the whole corpus.
+
+The corpus is every .html file in the given directory or, by default, a set
+of generated pages (article, table, script-heavy and deeply nested).
+
+Usage: python benchmarks/html_parsers.py [corpus directory]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import toolboxy.web_scrapping as web_scrapping
+
+BACKENDS = ('bs4', 'lxml', 'html.parser')
+MODES = ('html', 'text')
+
+
+def generated_corpus() -> list:
+    """Builds a deterministic corpus of synthetic pages."""
+    paragraph = ('<p>Lorem <b>ipsum</b> dolor sit amet, <a href="/x?a=1&amp;b=2">'
+                 'consectetur</a> adipiscing elit &copy; 2023.</p>\n')
+    article = ('<!DOCTYPE html><html><head><title>Article</title></head><body>'
+               + '<h2>Section</h2>' + paragraph * 2000 + '</body></html>')
+    table = ('<html><body><table>' + ''.join(
+        f'<tr><td>{r}</td><td>value {r}</td><td>{r * 3.14:.2f}</td></tr>'
+        for r in range(5000)) + '</table></body></html>')
+    scripts = ('<html><head>' + '<script>var data = [' + ','.join(
+        str(n) for n in range(20000)) + '];</script>' * 10 +
+               '<style>body { color: red; }</style></head><body>' +
+               paragraph * 200 + '</body></html>')
+    nested = ('<html><body>' + '<div><span>nested' * 500 +
+              '</span></div>' * 500 + '</body></html>')
+    return [article, table, scripts, nested] * 5
+
+
+def load_corpus(directory: str) -> list:
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), encoding='utf-8',
+                      errors='replace') as f:
+                pages.append(f.read())
+    return pages
+
+
+def peak_memory_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1048576 if sys.platform == 'darwin' else peak / 1024
+
+
+def run(backend: str, mode: str, directory: str) -> dict:
+    """Converts the corpus once with one backend, in the current process."""
+    pages = load_corpus(directory) if directory else generated_corpus()
+    baseline = peak_memory_mb()
+    with tempfile.TemporaryDirectory() as temp:
+        output = os.path.join(temp, 'output.txt')
+        start = time.perf_counter()
+        for page in pages:
+            web_scrapping._convert_html(page, output, mode, backend)
+        elapsed = time.perf_counter() - start
+    return {
+        'pages_per_second': len(pages) / elapsed,
+        'peak_mb': peak_memory_mb(),
+        'baseline_mb': baseline
+    }
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--run':
+        print(json.dumps(run(sys.argv[2], sys.argv[3], sys.argv[4])))
+        return
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else ''
+    print(f'{"backend":<14}{"mode":<6}{"pages/s":>10}{"peak MB":>10}')
+    for backend in BACKENDS:
+        for mode in MODES:
+            # Each backend runs in a fresh process so peak memory is comparable.
+            result = json.loads(
+                subprocess.run(
+                    [sys.executable, __file__, '--run', backend, mode, directory],
+                    capture_output=True,
+                    check=True,
+                    text=True).stdout)
+            print(f'{backend:<14}{mode:<6}{result["pages_per_second"]:>10.1f}'
+                  f'{result["peak_mb"]:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
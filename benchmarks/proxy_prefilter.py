@@ -0,0 +1,48 @@
+"""
+Compares toolboxy.verify_proxies with and without the TCP connect prefilter
+on a real proxy list, reporting total time and how many proxies passed each
+phase. Public lists are mostly dead or filtered ports, which the prefilter
+discards after prefilter_timeout instead of the full HTTP timeout.
+
+The list has one 'ip:port' per line (e.g. from https://free-proxy-list.net).
+
+Usage: python benchmarks/proxy_prefilter.py <proxy list> [echo url]
+"""
+import sys
+import time
+
+import toolboxy
+
+
+def run(proxies: list, echo_url: str, prefilter: bool) -> dict:
+    start = time.perf_counter()
+    results = list(
+        toolboxy.verify_proxies(proxies,
+                                echo_url=echo_url,
+                                timeout=5,
+                                concurrency=500,
+                                prefilter=prefilter,
+                                prefilter_timeout=1.0))
+    return {
+        'seconds': round(time.perf_counter() - start, 2),
+        'checked': len(results),
+        'tcp_open': sum(r['connect_time'] is not None for r in results),
+        'valid': sum(r['valid'] for r in results)
+    }
+
+
+def main():
+    with open(sys.argv[1]) as f:
+        proxies = [line.strip() for line in f if line.strip()]
+    echo_url = sys.argv[2] if len(sys.argv) > 2 else 'https://httpbin.org/ip'
+
+    start = time.perf_counter()
+    open_ports = sum(r['valid'] for r in toolboxy.tcp_prefilter(proxies))
+    print(f'tcp_prefilter only: {open_ports}/{len(proxies)} open in '
+          f'{time.perf_counter() - start:.2f}s')
+    for prefilter in (False, True):
+        print(f'prefilter={prefilter}:', run(proxies, echo_url, prefilter))
+
+
+if __name__ == '__main__':
+    main()
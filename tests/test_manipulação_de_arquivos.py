@@ -1,3 +1,4 @@
+import pytest
 import toolboxy
 from random import randrange
 import os
@@ -69,4 +70,558 @@ def test_check_hash():
 
     os.remove('tests/cfg_test.cfg')
     os.remove('tests/backup_test.cfg')
-    os.remove('tests/compare.cfg')
\ No newline at end of file
+    os.remove('tests/compare.cfg')
+
+
+def test_check_hash_streaming(tmp_path):
+    import hashlib
+
+    data = os.urandom(300_000)
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+
+    calls = []
+    digest = toolboxy.check_hash(str(path),
+                                 sha=256,
+                                 chunk_size=65536,
+                                 progress=lambda *args: calls.append(args))
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert len(calls) == 5
+    assert [c[1] for c in calls][-1] == len(data)
+    assert all(c[2] == len(data) for c in calls)
+    assert all(c[3] >= 0 for c in calls)
+
+    with pytest.raises(ValueError):
+        toolboxy.check_hash(str(path), chunk_size=0)
+
+
+def test_check_hash_many(tmp_path):
+    import hashlib
+
+    paths = []
+    for n in range(4):
+        path = tmp_path / f'same_{n}.bin'
+        path.write_bytes(b'toolboxy' * 10000)
+        paths.append(str(path))
+    different = tmp_path / 'different.bin'
+    different.write_bytes(b'toolboxz' * 10000)
+    shorter = tmp_path / 'shorter.bin'
+    shorter.write_bytes(b'toolboxy')
+
+    assert toolboxy.check_hash(*paths, workers=2)
+    assert toolboxy.check_hash(*paths, str(different), chunk_size=4096) == False
+    assert toolboxy.check_hash(*paths, str(shorter)) == False
+
+    hashes = toolboxy.hash_files(paths + [str(different)], sha=224)
+    assert list(hashes) == paths + [str(different)]
+    assert hashes[paths[0]] == hashlib.sha224(b'toolboxy' * 10000).hexdigest()
+    assert hashes[str(different)] == hashlib.sha224(b'toolboxz' *
+                                                    10000).hexdigest()
+
+
+def test_check_hash_cache(tmp_path):
+    import hashlib
+    import time
+
+    cache = str(tmp_path / 'hashes.db')
+    path = tmp_path / 'artifact.bin'
+    path.write_bytes(b'artifact' * 1000)
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+    expected = hashlib.sha256(b'artifact' * 1000).hexdigest()
+    assert toolboxy.check_hash(str(path), sha=256, cache=cache) == expected
+    assert toolboxy.hash_cache_stats(cache) == {
+        'hits': 0,
+        'misses': 1,
+        'entries': 1
+    }
+
+    reads = []
+    assert toolboxy.check_hash(str(path),
+                               sha=256,
+                               cache=cache,
+                               progress=lambda *args: reads.append(args)
+                               ) == expected
+    assert reads == []
+    assert toolboxy.hash_cache_stats(cache)['hits'] == 1
+
+    path.write_bytes(b'modified' * 1000)
+    os.utime(path, (old + 1, old + 1))
+    assert toolboxy.clear_hash_cache(cache, missing_only=True) == 1
+    assert toolboxy.check_hash(str(path), sha=256, cache=cache) == \
+        hashlib.sha256(b'modified' * 1000).hexdigest()
+    assert toolboxy.hash_cache_stats(cache)['misses'] == 2
+
+    toolboxy.check_hash(str(path), sha=1, cache=cache, cache_size=1)
+    assert toolboxy.hash_cache_stats(cache)['entries'] == 1
+    assert toolboxy.clear_hash_cache(cache) == 1
+    assert toolboxy.hash_cache_stats(cache) == {
+        'hits': 0,
+        'misses': 0,
+        'entries': 0
+    }
+
+
+def test_hash_cache_sharing(tmp_path, monkeypatch):
+    import time
+
+    cache = str(tmp_path / 'hashes.db')
+    old = time.time() - 60
+    paths = []
+    for name in ('a', 'b', 'c', 'd'):
+        path = tmp_path / f'{name}.bin'
+        path.write_bytes(name.encode() * 100000)
+        os.utime(path, (old, old))
+        paths.append(str(path))
+
+    toolboxy.check_hash(paths[0], paths[2], cache=cache)
+    # Another run on the same cache while this one is still open: the hit on
+    # 'a' must not keep a write transaction open until the end.
+    nested = []
+
+    def progress(*args):
+        if not nested:
+            nested.append(toolboxy.check_hash(paths[3], cache=cache))
+
+    start = time.monotonic()
+    toolboxy.check_hash(paths[0], paths[1], cache=cache, progress=progress,
+                        workers=1)
+    assert nested and time.monotonic() - start < 5
+    assert toolboxy.hash_cache_stats(cache)['entries'] == 4
+
+    # Reading the stats or cleaning up never evicts entries
+    monkeypatch.setattr(toolboxy.file_manipulation._HashCache.__init__,
+                        '__defaults__', (1, ))
+    assert toolboxy.hash_cache_stats(cache)['entries'] == 4
+    assert toolboxy.clear_hash_cache(cache, missing_only=True) == 0
+    assert toolboxy.hash_cache_stats(cache)['entries'] == 4
+
+
+def test_find_duplicates(tmp_path):
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    (tmp_path / 'c').mkdir()
+
+    big = os.urandom(200_000)
+    same_edges = bytearray(big)
+    same_edges[100_000] ^= 0xff
+
+    files = {
+        'a/small_1.txt': b'duplicate',
+        'a/b/small_2.txt': b'duplicate',
+        'c/small_3.txt': b'different',
+        'a/big_1.bin': big,
+        'c/big_2.bin': big,
+        'a/b/big_3.bin': bytes(same_edges),
+        'c/empty_1.txt': b'',
+        'c/empty_2.txt': b'',
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_bytes(content)
+
+    groups = list(
+        toolboxy.find_duplicates(str(tmp_path / 'a'),
+                                 str(tmp_path / 'c'),
+                                 block_size=4096))
+    groups = sorted(
+        sorted(os.path.relpath(f, tmp_path).replace(os.sep, '/')
+               for f in group) for group in groups)
+
+    assert groups == [['a/b/small_2.txt', 'a/small_1.txt'],
+                      ['a/big_1.bin', 'c/big_2.bin']]
+
+    overlapping = list(
+        toolboxy.find_duplicates(str(tmp_path), str(tmp_path / 'a')))
+    assert len(overlapping) == 2
+    assert all(len(group) == 2 for group in overlapping)
+
+
+def test_tree_hash(tmp_path):
+    data = os.urandom(100_000)
+    path = tmp_path / 'image.bin'
+    path.write_bytes(data)
+
+    root, leaves = toolboxy.tree_hash(str(path), chunk_size=16384, leaves=True)
+    assert len(leaves) == 7
+    assert toolboxy.tree_hash(str(path), chunk_size=16384, workers=1) == root
+    assert toolboxy.tree_hash(str(path), chunk_size=32768) != root
+    assert toolboxy.check_hash(str(path), tree_chunk=16384,
+                               sha='blake2b') == root
+    assert toolboxy.check_hash(str(path), str(path), tree_chunk=16384)
+
+    corrupted = bytearray(data)
+    corrupted[40_000] ^= 0xff
+    path.write_bytes(bytes(corrupted))
+    assert [
+        toolboxy.verify_chunk(str(path), n, leaf, chunk_size=16384)
+        for n, leaf in enumerate(leaves)
+    ] == [True, True, False, True, True, True, True]
+
+    empty = tmp_path / 'empty.bin'
+    empty.write_bytes(b'')
+    assert toolboxy.tree_hash(str(empty)) == toolboxy.tree_hash(str(empty))
+
+
+def test_backup_directory(tmp_path):
+    source = tmp_path / 'project'
+    (source / 'src' / 'pkg').mkdir(parents=True)
+    (source / 'empty').mkdir()
+    contents = {
+        'README.md': b'readme',
+        'src/main.py': b'print(1)\n' * 100,
+        'src/pkg/data.bin': os.urandom(50_000),
+    }
+    for name, content in contents.items():
+        (source / name).write_bytes(content)
+
+    summary = toolboxy.backup(str(source),
+                              output_path=str(tmp_path / 'backups'),
+                              backup_name='project-copy',
+                              workers=2)
+
+    copy = tmp_path / 'backups' / 'project-copy'
+    assert summary['files'] == 3
+    assert summary['bytes'] == sum(len(c) for c in contents.values())
+    assert summary['throughput'] >= 0
+    assert (copy / 'empty').is_dir()
+    for name, content in contents.items():
+        assert (copy / name).read_bytes() == content
+
+
+def test_incremental_backup(tmp_path):
+    source = tmp_path / 'data'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'empty').mkdir()
+    (source / 'big.bin').write_bytes(os.urandom(10_000))
+    (source / 'sub' / 'notes.txt').write_bytes(b'first version')
+    (source / 'sub' / 'blank.txt').write_bytes(b'')
+    store = str(tmp_path / 'store')
+
+    first = toolboxy.incremental_backup(str(source), store, chunk_size=4096)
+    chunks = os.listdir(store + '/chunks')
+    assert sum(len(os.listdir(f'{store}/chunks/{c}')) for c in chunks) == 5
+
+    (source / 'sub' / 'notes.txt').write_bytes(b'second version')
+    second = toolboxy.incremental_backup(str(source), store, chunk_size=4096)
+    stored = sum(
+        len(os.listdir(f'{store}/chunks/{c}'))
+        for c in os.listdir(store + '/chunks'))
+    assert stored == 6
+
+    backups = toolboxy.list_backups(store)
+    assert [b['id'] for b in backups] == [first, second]
+    assert backups[1]['files'] == 3
+    assert backups[1]['bytes'] == 10_000 + len(b'second version')
+
+    toolboxy.restore_backup(store, first, str(tmp_path / 'restored'))
+    restored = tmp_path / 'restored'
+    assert (restored / 'big.bin').read_bytes() == (source /
+                                                   'big.bin').read_bytes()
+    assert (restored / 'sub' / 'notes.txt').read_bytes() == b'first version'
+    assert (restored / 'sub' / 'blank.txt').read_bytes() == b''
+    assert (restored / 'empty').is_dir()
+
+    assert toolboxy.gc_backups(store)['chunks'] == 0
+    collected = toolboxy.gc_backups(store, keep=1)
+    assert collected['snapshots'] == 1
+    assert collected['chunks'] == 1
+    assert collected['bytes'] == len(b'first version')
+    assert [b['id'] for b in toolboxy.list_backups(store)] == [second]
+
+
+def test_gc_backups_concurrent(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    source = tmp_path / 'data'
+    source.mkdir()
+    (source / 'a.bin').write_bytes(os.urandom(10_000))
+    store = str(tmp_path / 'store')
+    first = toolboxy.incremental_backup(str(source), store, chunk_size=4096)
+
+    # A backup that has stored its chunks but not yet its manifest
+    stored = threading.Event()
+    resume = threading.Event()
+    store_chunks = toolboxy.file_manipulation._store_chunks
+
+    def slow_store_chunks(*args):
+        chunks = store_chunks(*args)
+        stored.set()
+        resume.wait(5)
+        return chunks
+
+    monkeypatch.setattr(toolboxy.file_manipulation, '_store_chunks',
+                        slow_store_chunks)
+    (source / 'b.bin').write_bytes(os.urandom(10_000))
+    snapshots = []
+    backup = threading.Thread(target=lambda: snapshots.append(
+        toolboxy.incremental_backup(str(source), store, chunk_size=4096)))
+    backup.start()
+    assert stored.wait(5)
+
+    collected = []
+    gc = threading.Thread(
+        target=lambda: collected.append(toolboxy.gc_backups(store, keep=1)))
+    gc.start()
+    time.sleep(0.2)
+    assert not collected
+    resume.set()
+    backup.join(5)
+    gc.join(5)
+
+    assert collected == [{'snapshots': 1, 'chunks': 0, 'bytes': 0}]
+    assert [b['id'] for b in toolboxy.list_backups(store)] == snapshots
+    assert snapshots[0] != first
+    toolboxy.restore_backup(store, snapshots[0], str(tmp_path / 'restored'))
+    for name in ('a.bin', 'b.bin'):
+        assert (tmp_path / 'restored' / name).read_bytes() == (
+            source / name).read_bytes()
+
+def test_backup_symlinks(tmp_path):
+    source = tmp_path / 'linked'
+    (source / 'real').mkdir(parents=True)
+    (source / 'real' / 'a.txt').write_bytes(b'a')
+    (source / 'dir_link').symlink_to('real', target_is_directory=True)
+    (source / 'file_link').symlink_to('real/a.txt')
+    (source / 'dangling').symlink_to('missing.txt')
+
+    summary = toolboxy.backup(str(source),
+                              output_path=str(tmp_path / 'backups'),
+                              backup_name='linked-copy')
+    assert summary['files'] == 1
+    assert summary['links'] == 3
+    assert summary['skipped'] == []
+
+    store = str(tmp_path / 'store')
+    snapshot = toolboxy.incremental_backup(str(source), store)
+    toolboxy.restore_backup(store, snapshot, str(tmp_path / 'restored'))
+
+    for copy in (tmp_path / 'backups' / 'linked-copy', tmp_path / 'restored'):
+        assert os.readlink(copy / 'dir_link') == 'real'
+        assert os.readlink(copy / 'file_link') == 'real/a.txt'
+        assert os.readlink(copy / 'dangling') == 'missing.txt'
+        assert (copy / 'dir_link' / 'a.txt').read_bytes() == b'a'
+
+
+def test_backup_compressed(tmp_path):
+    import tarfile
+
+    source = tmp_path / 'logs'
+    (source / 'old').mkdir(parents=True)
+    contents = {
+        'app.log': b'INFO request served\n' * 150_000,
+        'old/app.log.1': os.urandom(100_000),
+    }
+    for name, content in contents.items():
+        (source / name).write_bytes(content)
+
+    for compression in ('gz', 'xz'):
+        summary = toolboxy.backup(str(source),
+                                  output_path=str(tmp_path / 'backups'),
+                                  backup_name='logs',
+                                  workers=3,
+                                  compression=compression,
+                                  level=1)
+        archive = tmp_path / 'backups' / f'logs.tar.{compression}'
+        assert summary['files'] == 2
+        assert summary['bytes'] == sum(len(c) for c in contents.values())
+        assert summary['compressed'] == archive.stat().st_size
+        assert summary['compressed'] < summary['bytes']
+
+        with tarfile.open(archive, f'r:{compression}') as tar:
+            for name, content in contents.items():
+                assert tar.extractfile(f'logs/{name}').read() == content
+
+
+def test_read_cfg_cache(tmp_path):
+    import time
+
+    path = str(tmp_path / 'service.cfg')
+    toolboxy.create_cfg(path, {'server': {'port': '8080'}})
+
+    first = toolboxy.read_cfg(path, cache=True)
+    assert first == {'server': {'port': '8080'}}
+    assert toolboxy.read_cfg(path, cache=True) is first
+    assert toolboxy.read_cfg(path) is not first
+
+    toolboxy.create_cfg(path, {'server': {'port': '443'}})
+    assert toolboxy.read_cfg(path, cache=True) == {'server': {'port': '443'}}
+
+    changes = []
+    toolboxy.watch_cfg(path, changes.append, interval=0.01)
+    try:
+        toolboxy.create_cfg(path, {'server': {'port': '10101'}})
+        deadline = time.monotonic() + 5
+        while not changes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert changes == [{'server': {'port': '10101'}}]
+        assert toolboxy.read_cfg(path, cache=True) is changes[0]
+    finally:
+        toolboxy.unwatch_cfg(path, changes.append)
+
+
+def test_watch_cfg_errors(tmp_path):
+    import time
+
+    path = str(tmp_path / 'watched.cfg')
+    toolboxy.create_cfg(path, {'s': {'k': '1'}})
+    seen = []
+
+    def broken(options):
+        raise RuntimeError('callback failure')
+
+    def wait_for(value):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if seen and seen[-1] == {'s': {'k': value}}:
+                return
+            time.sleep(0.01)
+
+    toolboxy.watch_cfg(path, broken, interval=0.01)
+    toolboxy.watch_cfg(path, seen.append)
+    try:
+        toolboxy.create_cfg(path, {'s': {'k': '22'}})
+        wait_for('22')
+        assert toolboxy.read_cfg(path, cache=True) == {'s': {'k': '22'}}
+
+        with open(path, 'w') as f:
+            f.write('no section header\n')
+        time.sleep(0.1)
+        toolboxy.create_cfg(path, {'s': {'k': '333'}})
+        wait_for('333')
+        assert seen[-1] == {'s': {'k': '333'}}
+        assert toolboxy.read_cfg(path, cache=True) == {'s': {'k': '333'}}
+
+        # A deleted file is reported once, not on every check
+        delivered = len(seen)
+        os.remove(path)
+        time.sleep(0.3)
+        assert seen[delivered:] == [{}]
+        toolboxy.create_cfg(path, {'s': {'k': '4444'}})
+        wait_for('4444')
+        assert seen[-1] == {'s': {'k': '4444'}}
+    finally:
+        toolboxy.unwatch_cfg(path)
+
+
+def test_read_cfg_lazy(tmp_path):
+    path = str(tmp_path / 'generated.cfg')
+    sections = {
+        f'Section {n}': {
+            'name': f'section {n}',
+            'value': str(n * n)
+        }
+        for n in range(500)
+    }
+    toolboxy.create_cfg(path, sections)
+    with open(path, 'a') as f:
+        f.write('\n[DEFAULT]\nshared = yes\n')
+
+    lazy = toolboxy.read_cfg(path, lazy=True)
+    assert len(lazy) == 500
+    assert list(lazy) == list(sections)
+    assert lazy.sections == {}
+
+    assert lazy['Section 42'] == {
+        'name': 'section 42',
+        'value': '1764',
+        'shared': 'yes'
+    }
+    assert list(lazy.sections) == ['Section 42']
+    assert dict(lazy) == toolboxy.read_cfg(path)
+
+    empty = tmp_path / 'empty.cfg'
+    empty.write_text('')
+    assert len(toolboxy.read_cfg(str(empty), lazy=True)) == 0
+
+
+def test_update_cfg(tmp_path):
+    path = str(tmp_path / 'app.cfg')
+    toolboxy.create_cfg(path, cfg_dict)
+    assert toolboxy.read_cfg(path) == cfg_dict
+    assert [f for f in os.listdir(tmp_path) if f.endswith('.tmp')] == []
+
+    with open(path, 'a') as f:
+        f.write('# keep this comment\n')
+    with open(path) as f:
+        original = f.read()
+
+    toolboxy.update_cfg(path, {'Sec1': {'opt1': 'new', 'opt3': None}})
+    with open(path) as f:
+        updated = f.read()
+    assert updated.endswith('[Sec2]\n' + original.split('[Sec2]\n')[1])
+    assert toolboxy.read_cfg(path) == {
+        'Sec1': {
+            'opt1': 'new',
+            'opt2': cfg_dict['Sec1']['opt2']
+        },
+        'Sec2': cfg_dict['Sec2']
+    }
+
+    toolboxy.update_cfg(path, {'Sec2': None, 'Sec3': {'opt1': 'added'}})
+    assert toolboxy.read_cfg(path) == {
+        'Sec1': {
+            'opt1': 'new',
+            'opt2': cfg_dict['Sec1']['opt2']
+        },
+        'Sec3': {
+            'opt1': 'added'
+        }
+    }
+
+    mtime = os.stat(path).st_mtime_ns
+    toolboxy.update_cfg(path, {'Sec3': {'opt1': 'added'}})
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_update_cfg_option_case(tmp_path):
+    path = str(tmp_path / 'case.cfg')
+    toolboxy.create_cfg(path, {'section': {'A': '1', 'B': '2'}})
+
+    toolboxy.update_cfg(path, {'section': {'B': '3'}, 'New': {'C': '4'}})
+    assert toolboxy.read_cfg(path) == {
+        'section': {
+            'a': '1',
+            'b': '3'
+        },
+        'New': {
+            'c': '4'
+        }
+    }
+
+    toolboxy.update_cfg(path, {'section': {'A': None}, 'New': {'C': '5'}})
+    assert toolboxy.read_cfg(path) == {
+        'section': {
+            'b': '3'
+        },
+        'New': {
+            'c': '5'
+        }
+    }
+
+
+def test_read_cfg_snapshot(tmp_path, monkeypatch):
+    import configparser
+
+    path = str(tmp_path / 'cli.cfg')
+    toolboxy.create_cfg(path, cfg_dict)
+
+    assert toolboxy.read_cfg(path, snapshot=True) == cfg_dict
+    assert os.path.exists(path + '.snapshot')
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError('the snapshot should have been used')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(configparser.ConfigParser, 'read', no_parsing)
+        assert toolboxy.read_cfg(path, snapshot=True) == cfg_dict
+        os.utime(path, ns=(0, 0))
+        assert toolboxy.read_cfg(path, snapshot=True) == cfg_dict
+
+    toolboxy.update_cfg(path, {'Sec1': {'opt3': 'changed'}})
+    assert toolboxy.read_cfg(path, snapshot=True)['Sec1']['opt3'] == 'changed'
+
+    with open(path + '.snapshot', 'wb') as f:
+        f.write(b'corrupted')
+    assert toolboxy.read_cfg(path, snapshot=True) == toolboxy.read_cfg(path)
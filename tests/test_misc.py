@@ -16,6 +16,75 @@ def test_delay_print(capsys):
     assert captured.out == 'test_delay_print_n2\n'
 
 
+def test_delay_print_timing(monkeypatch):
+    import io
+    import time
+
+    class CountingStream(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            CountingStream.writes += 1
+            return super().write(text)
+
+    stream = CountingStream()
+    monkeypatch.setattr('sys.stdout', stream)
+
+    toolboxy.delay_print('')
+    assert stream.getvalue() == '\n'
+
+    text = 'lorem ipsum dolor sit amet ' * 40
+    CountingStream.writes = 0
+    start = time.monotonic()
+    toolboxy.delay_print(text, wpm=12000)  # 200 words in 1 second
+    elapsed = time.monotonic() - start
+
+    assert stream.getvalue() == '\n' + text + '\n'
+    # The pacing follows the schedule instead of drifting with each sleep
+    assert abs(elapsed - 1.0) < 0.25
+    assert CountingStream.writes < len(text) / 2
+
+
+def test_adelay_print(capsys):
+    import asyncio
+    import io
+    import time
+
+    class AsyncStream:
+
+        def __init__(self):
+            self.parts = []
+
+        async def write(self, text):
+            self.parts.append(text)
+
+    async def tokens(n):
+        for word in ['lorem ', 'ipsum ', 'dolor '] * n:
+            await asyncio.sleep(0.001)
+            yield word
+
+    async def main():
+        streams = [AsyncStream() for _ in range(50)]
+        sync_stream = io.StringIO()
+        await asyncio.gather(
+            toolboxy.adelay_print('test_adelay_print', wpm=6000),
+            toolboxy.adelay_print(['a ', 'b'], stream=sync_stream, end=''),
+            *(toolboxy.adelay_print(tokens(10), wpm=3000, stream=stream)
+              for stream in streams))
+        return streams, sync_stream
+
+    start = time.monotonic()
+    streams, sync_stream = asyncio.run(main())
+    elapsed = time.monotonic() - start
+
+    # 180 characters at 3000 wpm (5 characters per word) take 0.72 seconds
+    assert abs(elapsed - 0.72) < 0.25
+    assert capsys.readouterr().out == 'test_adelay_print\n'
+    assert sync_stream.getvalue() == 'a b'
+    for stream in streams:
+        assert ''.join(stream.parts) == 'lorem ipsum dolor ' * 10 + '\n'
+
+
 def test_gpt_docstring():
     response = toolboxy.gpt_docstring(useless_function)
     assert response
@@ -23,6 +92,108 @@ def test_gpt_docstring():
     assert 'English' in response
 
 
+def test_gpt_docstrings(tmp_path):
+    import json
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    requests_seen = []
+
+    class CompletionStub(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            code = body['prompt'].split('Função:\n', 1)[1]
+            name = code.split('def ', 1)[1].split('(', 1)[0]
+            requests_seen.append((name, self.headers['Authorization']))
+            if name == 'flaky' and len([n for n, _ in requests_seen
+                                        if n == 'flaky']) == 1:
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.end_headers()
+                return
+            answer = json.dumps({
+                'choices': [{'text': f'"""Docstring of {name}."""'}],
+                'usage': {'total_tokens': 50}
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(answer)))
+            self.end_headers()
+            self.wfile.write(answer)
+
+    package = tmp_path / 'pkg'
+    (package / 'sub').mkdir(parents=True)
+    (package / '__init__.py').write_text('def top():\n    pass\n')
+    (package / 'sub' / 'tools.py').write_text(
+        'def flaky(x):\n    return x\n\n\n'
+        'def documented():\n    """Already documented."""\n\n\n'
+        'def _private():\n    pass\n\n\n'
+        'class Box:\n\n    def open(self):\n        pass\n\n'
+        '    async def close(self):\n        pass\n')
+    for n in range(4):
+        (package / f'mod{n}.py').write_text(f'def f{n}():\n    return {n}\n')
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CompletionStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    start = time.monotonic()
+    docstrings = toolboxy.gpt_docstrings(
+        str(package),
+        api_key='test-key',
+        api_base=f'http://127.0.0.1:{server.server_address[1]}/v1',
+        rpm=240,
+        workers=4)
+    elapsed = time.monotonic() - start
+    server.shutdown()
+    server.server_close()
+
+    expected = ['pkg.top', 'pkg.mod0.f0', 'pkg.mod1.f1', 'pkg.mod2.f2',
+                'pkg.mod3.f3', 'pkg.sub.tools.flaky', 'pkg.sub.tools.Box.open',
+                'pkg.sub.tools.Box.close']
+    assert sorted(docstrings) == sorted(expected)
+    assert docstrings['pkg.sub.tools.Box.close'] == '"""Docstring of close."""'
+    assert len(requests_seen) == 9
+    assert all(auth == 'Bearer test-key' for _, auth in requests_seen)
+    # 4 requests per second, in bursts of at most 4
+    assert elapsed >= 1.2
+
+
+def test_collect_functions_private(tmp_path):
+    from toolboxy.misc import _collect_functions
+
+    package = tmp_path / 'pkg'
+    (package / '_internal').mkdir(parents=True)
+    (package / '__pycache__').mkdir()
+    (package / '__init__.py').write_text('def top():\n    pass\n')
+    (package / '_helpers.py').write_text('def helper():\n    pass\n')
+    (package / '_internal' / 'core.py').write_text('def run():\n    pass\n')
+    (package / '__pycache__' / 'stale.py').write_text('def old():\n    pass\n')
+
+    public = _collect_functions(str(package), False, True)
+    assert [name for name, _ in public] == ['pkg.top']
+    private = _collect_functions(str(package), True, True)
+    assert sorted(name for name, _ in private) == [
+        'pkg._helpers.helper', 'pkg._internal.core.run', 'pkg.top'
+    ]
+
+def test_rate_limiter_refunds():
+    from toolboxy.misc import _RateLimiter
+
+    limiter = _RateLimiter(rpm=6000, tpm=10000)
+    capacity = limiter.capacity[1]
+    charged = limiter.acquire(700)
+    assert charged == capacity
+    limiter.adjust(100 - charged)
+    assert 99 < capacity - limiter.levels[1] <= 100
+
+    limiter.adjust(-10000)
+    assert limiter.levels[1] == capacity
+
+
 def test_uuid():
     letters = 'abcdefghijklmnopqrstuvwxyz'
     numbers = '0123456789'
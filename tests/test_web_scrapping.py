@@ -1,5 +1,9 @@
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
+import pytest
 import requests as re
 
 import toolboxy
@@ -15,6 +19,117 @@ sec-fetch-site: cross-site
 user-agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"""
 
 
+class LocalHandler(BaseHTTPRequestHandler):
+    active = 0
+    max_active = 0
+    version = 1
+    full_responses = 0
+    paths = []
+    hops = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with LocalHandler.lock:
+            LocalHandler.active += 1
+            LocalHandler.max_active = max(LocalHandler.max_active,
+                                          LocalHandler.active)
+        try:
+            time.sleep(0.02)
+            if self.path.startswith('/page/'):
+                with LocalHandler.lock:
+                    LocalHandler.paths.append(self.path)
+                body = f'<html><body><p>{self.path}</p></body></html>'.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path.startswith('/site/'):
+                with LocalHandler.lock:
+                    LocalHandler.paths.append(self.path)
+                n = int(self.path.split('/')[2].split('?')[0])
+                body = (f'<html><body><p>site {n}</p>'
+                        f'<a href="{2 * n + 1}#top">left</a>'
+                        f'<a href="/site/./{2 * n + 2}?b=2&a=1">right</a>'
+                        f'<a href="/site/{2 * n + 2}?a=1&b=2">again</a>'
+                        '<a href="http://example.com/">out</a>'
+                        '</body></html>').encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path.startswith('/hop/'):
+                # Alternates between two host names of this same server.
+                with LocalHandler.lock:
+                    LocalHandler.hops.append((self.path, time.monotonic()))
+                n = int(self.path.split('/')[2])
+                port = self.server.server_address[1]
+                host = 'localhost' if n % 2 == 0 else '127.0.0.1'
+                links = '<a href="http://a:bad/">bad</a>'
+                if n < 2:
+                    links += f'<a href="http://{host}:{port}/hop/{n + 1}">next</a>'
+                body = f'<html><body><p>hop {n}</p>{links}</body></html>'.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path.endswith('/ip'):
+                # Answers both as echo server and, for absolute request
+                # targets, as the HTTP proxy in front of it.
+                body = f'{{"origin": "{self.client_address[0]}"}}'.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path == '/large':
+                items = ''.join(f'<li class="item">item {n} &amp; &lt;more&gt;</li>'
+                                for n in range(2000))
+                body = ('<!DOCTYPE html><html><head><title>Large</title>'
+                        '<script>if (a < b) {}</script></head><body><br>'
+                        f'<ul>{items}</ul></body></html>').encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif self.path.startswith('/cached/'):
+                etag = f'"{LocalHandler.version}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                LocalHandler.full_responses += 1
+                body = f'<p>{self.path} v{LocalHandler.version}</p>'.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_error(404)
+        finally:
+            with LocalHandler.lock:
+                LocalHandler.active -= 1
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LocalHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    LocalHandler.max_active = 0
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
 def test_chrome2dict():
     with open('tests/headers', 'w') as f:
         f.write(headers_str)
@@ -32,6 +147,46 @@ def test_chrome2dict():
     os.remove('tests/headers')
 
 
+def test_har2dict(tmp_path):
+    import json
+
+    def entry(url, n):
+        return {
+            'request': {
+                'method': 'GET',
+                'url': url,
+                'headers': [{'name': ':authority', 'value': 'example.com'},
+                            {'name': 'accept', 'value': f'text/{n}'}]
+            },
+            'response': {'content': {'text': 'x' * 5000}}
+        }
+
+    urls = [f'https://example.com/api/{n}' if n % 2 else
+            f'https://cdn.example.com/{n}.png' for n in range(20)]
+    har = {
+        'log': {
+            'version': '1.2',
+            'pages': [{'title': '"entries": [{"request": {}}]'}],
+            'entries': [entry(url, n) for n, url in enumerate(urls)]
+        }
+    }
+    har_path = str(tmp_path / 'capture.har')
+    with open(har_path, 'w', encoding='utf-8') as f:
+        json.dump(har, f, indent=1)
+
+    headers = list(toolboxy.har2dict(har_path, chunk_size=100))
+    assert len(headers) == 20
+    assert headers[3] == {':authority': 'example.com', 'accept': 'text/3'}
+
+    api = list(toolboxy.har2dict(har_path, url_pattern=r'/api/\d+$',
+                                 with_url=True))
+    assert [url for url, _ in api] == urls[1::2]
+    assert api[0][1]['accept'] == 'text/1'
+
+    parsed = toolboxy.chrome2dict(headers_str=f'{headers_str}\n:path: /a: b')
+    assert parsed[':path'] == '/a: b'
+
+
 def test_html2txt():
     response = re.get('https://api.my-ip.io/ip')
     toolboxy.html2txt(response=response, output_path='tests/re.txt')
@@ -44,3 +199,487 @@ def test_html2txt():
 def test_verify_proxy():
     #assert DevTools.verify_proxy(ip='178.33.198.181', port=3128, verbose=False)
     pass
+
+
+def test_verify_proxy_local(local_server):
+    port = int(local_server.rsplit(':', 1)[1])
+    echo_url = f'{local_server}/ip'
+
+    assert toolboxy.verify_proxy(ip='127.0.0.1', port=port, verbose=0,
+                                 echo_url=echo_url)
+
+
+def test_verify_proxies(local_server):
+    import socket
+
+    port = int(local_server.rsplit(':', 1)[1])
+    closed = socket.socket()
+    closed.bind(('127.0.0.1', 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+    silent = socket.socket()
+    silent.bind(('127.0.0.1', 0))
+    silent.listen()
+    silent_port = silent.getsockname()[1]
+
+    proxies = [f'127.0.0.1:{port}', ('127.0.0.1', closed_port),
+               ('127.0.0.1', silent_port), 'invalid']
+    proxies += [('127.0.0.1', port)] * 20
+    start = time.perf_counter()
+    results = list(toolboxy.verify_proxies(iter(proxies),
+                                           echo_url=f'{local_server}/ip',
+                                           timeout=1,
+                                           concurrency=4))
+    silent.close()
+
+    assert time.perf_counter() - start < 3
+    assert len(results) == len(proxies)
+    by_port = {r['port']: r for r in results}
+    valid = [r for r in results if r['valid']]
+    assert len(valid) == 21
+    assert all(0 < r['connect_time'] <= r['latency'] for r in valid)
+    assert by_port[closed_port]['error'] is not None
+    assert by_port[silent_port]['error'] == 'Tempo esgotado'
+    assert by_port[silent_port]['connect_time'] is not None
+    assert by_port[None]['proxy'] == 'invalid'
+    assert results[-1]['port'] == silent_port
+
+
+def test_verify_proxies_iterator_error(local_server):
+    port = int(local_server.rsplit(':', 1)[1])
+
+    def broken():
+        yield f'127.0.0.1:{port}'
+        raise OSError('proxy list unreadable')
+
+    with pytest.raises(OSError, match='proxy list unreadable'):
+        list(toolboxy.tcp_prefilter(broken()))
+    with pytest.raises(OSError, match='proxy list unreadable'):
+        list(toolboxy.verify_proxies(broken(), echo_url=f'{local_server}/ip'))
+
+
+def test_tcp_prefilter(local_server):
+    import socket
+
+    port = int(local_server.rsplit(':', 1)[1])
+    closed = socket.socket()
+    closed.bind(('127.0.0.1', 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    proxies = [('127.0.0.1', closed_port)] * 200 + [f'127.0.0.1:{port}']
+    results = list(toolboxy.tcp_prefilter(proxies, timeout=0.5))
+    assert len(results) == 201
+    assert [r['port'] for r in results if r['valid']] == [port]
+    assert all(r['error'] for r in results if not r['valid'])
+
+    results = list(toolboxy.verify_proxies(proxies + [('127.0.0.1', port)],
+                                           echo_url=f'{local_server}/ip',
+                                           timeout=1,
+                                           concurrency=2,
+                                           prefilter=True,
+                                           prefilter_timeout=0.5))
+    assert len(results) == 202
+    valid = [r for r in results if r['valid']]
+    assert len(valid) == 2
+    assert all(r['latency'] is not None for r in valid)
+    assert all(r['connect_time'] is None and r['error'] for r in results
+               if r['port'] == closed_port)
+
+    first = next(toolboxy.verify_proxies(iter(proxies * 10),
+                                         echo_url=f'{local_server}/ip',
+                                         timeout=1,
+                                         prefilter=True))
+    assert first['valid'] is False
+
+
+def test_verify_proxies_socket_budget(local_server, monkeypatch):
+    from toolboxy import web_scrapping
+
+    port = int(local_server.rsplit(':', 1)[1])
+    wanted = []
+
+    def budget(n):
+        wanted.append(n)
+        return min(n, 10)
+
+    monkeypatch.setattr(web_scrapping, '_socket_budget', budget)
+    results = list(toolboxy.verify_proxies([('127.0.0.1', port)] * 5,
+                                           echo_url=f'{local_server}/ip',
+                                           timeout=1,
+                                           concurrency=500,
+                                           prefilter=True,
+                                           prefilter_concurrency=2000))
+    # One budget for the sockets of both phases, which run together
+    assert wanted[0] == 2500
+    assert sum(wanted[1:]) <= 10
+    assert [r['valid'] for r in results] == [True] * 5
+
+def test_proxy_pool():
+    pool = toolboxy.ProxyPool(
+        ['10.0.0.1:80', ('10.0.0.2', 8080)] + [{
+            'proxy': '10.0.0.3:3128',
+            'valid': True,
+            'latency': 0.01
+        }, {
+            'proxy': '10.0.0.4:3128',
+            'valid': False,
+            'latency': None
+        }],
+        max_failures=2)
+
+    assert len(pool) == 3
+    assert '10.0.0.4:3128' not in pool
+    picks = [pool.get() for _ in range(2000)]
+    assert picks.count('10.0.0.3:3128') > 1800
+
+    pool.report('10.0.0.3:3128', False)
+    assert '10.0.0.3:3128' in pool
+    pool.report('10.0.0.3:3128', True, 0.01)
+    pool.report('10.0.0.3:3128', False)
+    pool.report('10.0.0.3:3128', False)
+    assert '10.0.0.3:3128' not in pool
+    assert set(pool.get() for _ in range(200)) == {'10.0.0.1:80', '10.0.0.2:8080'}
+
+    pool.add('10.0.0.5:80', latency=0.001)
+    assert len(pool) == 3
+    for _ in range(2):
+        pool.report('10.0.0.1:80', False)
+        pool.report(('10.0.0.2', 8080), False)
+    assert set(pool.get() for _ in range(50)) == {'10.0.0.5:80'}
+    pool.remove('10.0.0.5:80')
+    with pytest.raises(ValueError):
+        pool.get()
+
+
+def test_proxy_pool_revalidation(local_server):
+    port = int(local_server.rsplit(':', 1)[1])
+    with toolboxy.ProxyPool([f'127.0.0.1:{port}', '127.0.0.1:1'],
+                            max_failures=1,
+                            revalidate_rate=20,
+                            revalidate_interval=0,
+                            echo_url=f'{local_server}/ip',
+                            timeout=1) as pool:
+        deadline = time.monotonic() + 3
+        while '127.0.0.1:1' in pool and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert '127.0.0.1:1' not in pool
+        assert f'127.0.0.1:{port}' in pool
+        latency = pool.stats()[0]['latency']
+        assert latency < 1
+
+    # Each tick pops the oldest check instead of scanning every proxy
+    with toolboxy.ProxyPool([f'10.0.0.{n}:80' for n in range(1, 6)],
+                            revalidate_rate=1e-9,
+                            revalidate_interval=0) as pool:
+        pool.remove('10.0.0.1:80')
+        assert pool._due_check() == '10.0.0.2:80'
+        assert pool._due_check() == '10.0.0.3:80'
+        pool.revalidate_interval = 60
+        assert pool._due_check() is None
+        assert sorted(proxy for _, proxy in pool._checks) == [
+            '10.0.0.4:80', '10.0.0.5:80'
+        ]
+
+
+def test_html2txt_many(local_server, tmp_path):
+    urls = [f'{local_server}/page/{n}' for n in range(12)]
+    urls.append(f'{local_server}/missing')
+
+    results = toolboxy.html2txt_many(urls,
+                                     output_dir=str(tmp_path),
+                                     max_workers=8,
+                                     per_host=3)
+
+    assert [r['url'] for r in results] == urls
+    assert LocalHandler.max_active <= 3
+    for n, result in enumerate(results[:-1]):
+        assert result['status'] == 200
+        assert result['error'] is None
+        assert result['elapsed'] > 0
+        with open(result['output_path'], encoding='utf-8') as f:
+            assert f'/page/{n}' in f.read()
+    assert results[-1]['status'] == 404
+    assert results[-1]['error'] == 'HTTP 404'
+    assert not os.path.exists(results[-1]['output_path'])
+
+
+def test_html2txt_many_grouped_hosts(local_server, tmp_path):
+    port = int(local_server.rsplit(':', 1)[1])
+    urls = [f'{local_server}/page/{n}' for n in range(8)]
+    urls += [f'http://localhost:{port}/page/{n}' for n in range(8, 16)]
+    LocalHandler.paths = []
+
+    results = toolboxy.html2txt_many(urls,
+                                     output_dir=str(tmp_path),
+                                     max_workers=8,
+                                     per_host=2)
+
+    assert [r['status'] for r in results] == [200] * 16
+    assert [r['url'] for r in results] == urls
+    # Both hosts are served at the same time, never more than 2 each
+    assert LocalHandler.max_active == 4
+    first = [int(path.split('/')[2]) for path in LocalHandler.paths[:4]]
+    assert sum(n >= 8 for n in first) == 2
+
+
+def test_html2txt_many_output_paths(local_server, tmp_path):
+    urls = [f'{local_server}/page/{n}' for n in range(3)]
+    paths = (str(tmp_path / f'out_{n}.txt') for n in range(3))
+
+    results = toolboxy.html2txt_many(urls, output_paths=paths)
+
+    assert [r['status'] for r in results] == [200] * 3
+    assert [r['output_path'] for r in results
+            ] == [str(tmp_path / f'out_{n}.txt') for n in range(3)]
+    with pytest.raises(ValueError):
+        toolboxy.html2txt_many(urls, output_paths=[str(tmp_path / 'a.txt')])
+
+def test_html2txt_cache(local_server, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    output = str(tmp_path / 'page.txt')
+    url = f'{local_server}/cached/page'
+    LocalHandler.version = 1
+    LocalHandler.full_responses = 0
+
+    toolboxy.html2txt(url=url, output_path=output, cache_dir=cache_dir)
+    mtime = os.stat(output).st_mtime_ns
+    toolboxy.html2txt(url=url, output_path=output, cache_dir=cache_dir)
+    assert os.stat(output).st_mtime_ns == mtime
+    assert LocalHandler.full_responses == 1
+
+    other_output = str(tmp_path / 'copy.txt')
+    toolboxy.html2txt(url=url, output_path=other_output, cache_dir=cache_dir)
+    with open(other_output, encoding='utf-8') as f:
+        assert '/cached/page v1' in f.read()
+    assert LocalHandler.full_responses == 1
+
+    LocalHandler.version = 2
+    toolboxy.html2txt(url=url, output_path=output, cache_dir=cache_dir)
+    with open(output, encoding='utf-8') as f:
+        assert '/cached/page v2' in f.read()
+    assert LocalHandler.full_responses == 2
+
+    stats = toolboxy.http_cache_stats(cache_dir)
+    assert stats['hits'] == 2
+    assert stats['misses'] == 2
+    assert stats['entries'] == 1
+
+    toolboxy.html2txt_many([f'{local_server}/cached/{n}' for n in range(4)],
+                           output_dir=str(tmp_path),
+                           cache_dir=cache_dir,
+                           cache_size=40)
+    stats = toolboxy.http_cache_stats(cache_dir)
+    assert stats['misses'] == 6
+    assert stats['bytes'] <= 40
+
+
+def test_html2txt_cache_sharing(local_server, tmp_path):
+    import sqlite3
+
+    cache_dir = str(tmp_path / 'cache')
+    cache = toolboxy.web_scrapping._HttpCache(cache_dir)
+    try:
+        for n in range(2):
+            output = tmp_path / f'{n}.txt'
+            status = cache.fetch(re.get, f'{local_server}/cached/shared{n}',
+                                 str(output), {}, {}, 5, False,
+                                 output.write_text, 'html')
+            assert status == 200
+        # Another run on the same directory sees the entries before close()
+        assert not cache.connection.in_transaction
+        other = sqlite3.connect(os.path.join(cache_dir, 'index.db'),
+                                timeout=1)
+        assert other.execute('SELECT COUNT(*) FROM responses').fetchone()[0] == 2
+        other.close()
+    finally:
+        cache.close()
+
+def test_html2txt_stream(local_server, tmp_path):
+    from bs4 import BeautifulSoup
+
+    streamed = str(tmp_path / 'streamed.txt')
+    toolboxy.html2txt(url=f'{local_server}/large',
+                      output_path=streamed,
+                      stream=True,
+                      chunk_size=1024)
+    with open(streamed, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    assert lines[:4] == ['<!DOCTYPE html>', '<html>', ' <head>', '  <title>']
+    assert lines.count('   <li class="item">') == 2000
+    assert '    item 1999 &amp; &lt;more&gt;' in lines
+    assert '  <br/>' in lines
+    assert '   if (a < b) {}' in lines
+    assert lines[-1] == '</html>'
+
+    response = re.get(f'{local_server}/large')
+    text = BeautifulSoup(response.text, features='lxml').get_text()
+    for n in (0, 999, 1999):
+        assert f'item {n} & <more>' in text
+
+
+def test_html2txt_text_mode(local_server, tmp_path):
+    url = f'{local_server}/large'
+    outputs = []
+    for parser in ('bs4', 'lxml', 'html.parser'):
+        output = str(tmp_path / f'{parser}.txt')
+        toolboxy.html2txt(url=url, output_path=output, mode='text', parser=parser)
+        with open(output, encoding='utf-8') as f:
+            outputs.append(f.read())
+
+    streamed = str(tmp_path / 'streamed.txt')
+    toolboxy.html2txt(url=url, output_path=streamed, mode='text', stream=True)
+    with open(streamed, encoding='utf-8') as f:
+        outputs.append(f.read())
+
+    lines = outputs[0].splitlines()
+    assert lines[0] == 'Large'
+    assert lines[1] == 'item 0 & <more>'
+    assert len(lines) == 2001
+    assert 'if (a < b) {}' not in outputs[0]
+    assert all(output == outputs[0] for output in outputs)
+
+    with pytest.raises(ValueError):
+        toolboxy.html2txt(url=url, output_path=streamed, parser='regex')
+
+
+def test_html2txt_pipeline(local_server, tmp_path):
+    urls = [f'{local_server}/page/{n}' for n in range(10)]
+    urls.append(f'{local_server}/missing')
+
+    results, stats = toolboxy.html2txt_pipeline(urls,
+                                                output_dir=str(tmp_path),
+                                                fetch_workers=4,
+                                                parse_workers=2,
+                                                queue_size=2,
+                                                mode='text',
+                                                parser='lxml')
+
+    assert [r['url'] for r in results] == urls
+    for n, result in enumerate(results[:-1]):
+        assert result['status'] == 200
+        assert result['error'] is None
+        assert result['parse_time'] > 0
+        with open(result['output_path'], encoding='utf-8') as f:
+            assert f.read() == f'/page/{n}\n'
+    assert results[-1]['error'] == 'HTTP 404'
+    assert results[-1]['parse_time'] is None
+
+    assert stats['fetch']['count'] == 11
+    assert stats['queue']['count'] == 11
+    assert stats['parse']['count'] == 10
+    assert stats['queue']['max_depth'] <= 2
+    assert stats['fetch']['max'] >= stats['fetch']['mean'] > 0
+
+
+def test_html2txt_pipeline_error(local_server, tmp_path, monkeypatch):
+    import concurrent.futures
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    class BrokenPool(ThreadPoolExecutor):
+        submits = 0
+
+        def __init__(self, max_workers=None):
+            super().__init__(max_workers=1)
+
+        def submit(self, *args, **kwargs):
+            BrokenPool.submits += 1
+            if BrokenPool.submits == 2:
+                raise BrokenProcessPool('parser pool broken')
+            return super().submit(*args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', BrokenPool)
+    errors = []
+
+    def run():
+        try:
+            toolboxy.html2txt_pipeline(
+                [f'{local_server}/page/{n}' for n in range(12)],
+                output_dir=str(tmp_path),
+                fetch_workers=4,
+                queue_size=1)
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    # Blocked fetchers must give up instead of hanging the pipeline
+    thread.join(10)
+    assert not thread.is_alive()
+    assert isinstance(errors[0], BrokenProcessPool)
+
+def test_normalize_url():
+    assert toolboxy.normalize_url('HTTP://Example.COM:80/a/./b/../c?z=1&a=%2f#x'
+                                  ) == 'http://example.com/a/c?a=%2F&z=1'
+    assert toolboxy.normalize_url('https://example.com:443') == 'https://example.com/'
+    assert toolboxy.normalize_url('https://example.com:8443/dir/'
+                                  ) == 'https://example.com:8443/dir/'
+    assert toolboxy.normalize_url('../x', 'http://example.com/a/b/c'
+                                  ) == 'http://example.com/a/x'
+
+
+def test_crawl(local_server, tmp_path):
+    LocalHandler.paths = []
+    results = list(toolboxy.crawl([f'{local_server}/site/0'],
+                                  output_dir=str(tmp_path),
+                                  max_depth=2,
+                                  delay=0,
+                                  fp_rate=0))
+
+    assert sorted(LocalHandler.paths) == sorted(
+        ['/site/0', '/site/1', '/site/2?a=1&b=2', '/site/3',
+         '/site/4?a=1&b=2', '/site/5', '/site/6?a=1&b=2'])
+    assert [r['depth'] for r in results] == [0, 1, 1, 2, 2, 2, 2]
+    assert all(r['status'] == 200 and r['error'] is None for r in results)
+    with open(results[0]['output_path'], encoding='utf-8') as f:
+        assert f.read().startswith('site 0\n')
+
+
+def test_crawl_checkpoint(local_server, tmp_path):
+    checkpoint = str(tmp_path / 'crawl.ckpt')
+    LocalHandler.paths = []
+    options = dict(output_dir=str(tmp_path),
+                   max_depth=3,
+                   delay=0.01,
+                   checkpoint=checkpoint,
+                   checkpoint_every=2)
+
+    first = list(toolboxy.crawl([f'{local_server}/site/0'],
+                                max_pages=5,
+                                **options))
+    assert len(first) == 5
+    assert os.path.exists(checkpoint)
+
+    second = list(toolboxy.crawl([f'{local_server}/site/0'], **options))
+    assert len(second) == 10
+    assert len(LocalHandler.paths) == len(set(LocalHandler.paths)) == 15
+    assert {r['output_path'] for r in first}.isdisjoint(
+        r['output_path'] for r in second)
+
+    bloom = toolboxy.web_scrapping._BloomFilter(1000, 0.01)
+    assert bloom.add('a') and not bloom.add('a')
+    assert 'a' in bloom and 'b' not in bloom
+
+
+def test_crawl_host_delay(local_server, tmp_path):
+    port = int(local_server.rsplit(':', 1)[1])
+    checkpoint = str(tmp_path / 'hops.ckpt')
+    LocalHandler.hops = []
+
+    results = list(toolboxy.crawl([f'{local_server}/hop/0'],
+                                  output_dir=str(tmp_path),
+                                  allowed_domains=['127.0.0.1', 'localhost'],
+                                  delay=0.5,
+                                  checkpoint=checkpoint))
+
+    assert [r['error'] for r in results] == [None, None, None]
+    times = dict(LocalHandler.hops)
+    assert times['/hop/2'] - times['/hop/0'] >= 0.5
+
+    resumed = list(toolboxy.crawl([f'http://localhost:{port}/hop/0',
+                                   f'http://localhost:{port}/hop/1'],
+                                  output_dir=str(tmp_path),
+                                  checkpoint=checkpoint))
+    assert [r['url'] for r in resumed] == [f'http://localhost:{port}/hop/0']
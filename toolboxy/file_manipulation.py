@@ -1,8 +1,41 @@
+from collections.abc import Mapping as _Mapping
+
+
+def _atomic_write(file: str, text: str | bytes):
+    """Writes `text` to a temporary file in the same directory, fsyncs it and
+    renames it over `file`, so readers never see a partially written file."""
+    import os
+    import shutil
+    import threading
+
+    temp = os.path.join(
+        os.path.dirname(os.path.abspath(file)),
+        f'.{os.path.basename(file)}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        with open(temp, 'wb' if isinstance(text, bytes) else 'w') as output:
+            output.write(text)
+            output.flush()
+            os.fsync(output.fileno())
+        if os.path.exists(file):
+            shutil.copymode(file, temp)
+        os.replace(temp, file)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def _format_cfg_section(section: str, options: dict) -> str:
+    """Formats one section in the layout written by create_cfg."""
+    return f'[{section}]\n' + ''.join(f'{option}={value}\n'
+                                      for option, value in options.items())
+
+
 def create_cfg(file: str, cfg_dict: dict):
     """
     English:
     ----------
-    Creates a configuration file from a dictionary. Note: the names of the options must be lowercase.
+    Creates a configuration file from a dictionary. Note: the names of the options must be lowercase. The file is written atomically (temporary file, fsync and rename), so readers never see a partially written file.
 
     Parameters
     ----------
@@ -17,7 +50,7 @@ def create_cfg(file: str, cfg_dict: dict):
 
     Português (brasileiro):
     ----------
-    Cria um arquivo de configuração a partir de um dicionário. Obs.: os nomes das opções devem ser minúsculos.
+    Cria um arquivo de configuração a partir de um dicionário. Obs.: os nomes das opções devem ser minúsculos. O arquivo é gravado de forma atômica (arquivo temporário, fsync e renomeação), de modo que leitores nunca veem um arquivo gravado pela metade.
 
     Parâmetros
     ----------
@@ -30,43 +63,116 @@ def create_cfg(file: str, cfg_dict: dict):
     -------
     None
     """
-    with open(file, 'w') as file:
-        for section, options in cfg_dict.items():
-            file.write(f'\n[{section}]\n')
-            for option, value in options.items():
-                file.write(f'{option}={value}\n')
+    _atomic_write(
+        file, ''.join(f'\n{_format_cfg_section(section, options)}'
+                      for section, options in cfg_dict.items()))
 
 
-def read_cfg(file: str):
+def update_cfg(file: str, cfg_dict: dict):
     """
     English:
     ----------
-    Reads a .cfg configuration file and returns the options as a dictionary.
+    Updates a configuration file, rewriting only the sections that changed. Sections not present in the dictionary are kept as they are, including their comments; comments inside a rewritten section are dropped. Option names are lowercased, as read_cfg returns them. The file is written atomically, like in create_cfg.
 
     Parameters
     ----------
     file : str
-        The name of the configuration file to be read.
+        The path to the configuration file. It is created if it does not exist.
+    cfg_dict : dict
+        The dictionary with the sections to be updated, in the same format used by create_cfg. An option with the value None is removed, and a section with the value None is removed entirely.
 
     Returns
     -------
-    options : dict
-        A dictionary containing the options and their values, organized by section.
+    None
 
     Português (brasileiro):
     ----------
-    Lê um arquivo de configuração no formato .cfg e retorna as opções como um dicionário.
+    Atualiza um arquivo de configuração, reescrevendo apenas as seções que mudaram. Seções que não estão no dicionário são mantidas como estão, incluindo seus comentários; comentários dentro de uma seção reescrita são descartados. Os nomes das opções ficam em minúsculas, como read_cfg os retorna. O arquivo é gravado de forma atômica, como em create_cfg.
 
     Parâmetros
     ----------
     file : str
-        O nome do arquivo de configuração a ser lido.
+        O caminho para o arquivo de configuração. É criado caso não exista.
+    cfg_dict : dict
+        O dicionário com as seções a serem atualizadas, no mesmo formato usado por create_cfg. Uma opção com o valor None é removida, e uma seção com o valor None é removida por completo.
 
     Retorna
     -------
-    options : dict
-        Um dicionário contendo as opções e seus valores, organizados por seção.
+    None
     """
+    import re
+    from configparser import ConfigParser
+
+    try:
+        with open(file, 'r') as f:
+            text = f.read()
+    except FileNotFoundError:
+        text = ''
+
+    headers = [(match.start(), match.group(1))
+               for match in re.finditer(r'^\[([^\n]+)\]', text, re.MULTILINE)]
+    spans = dict()
+    for n, (start, section) in enumerate(headers):
+        end = headers[n + 1][0] if n + 1 < len(headers) else len(text)
+        spans.setdefault(section, (start, end))
+
+    # Option names are compared as ConfigParser reads them (lowercased), so
+    # updating 'B' replaces an existing 'b' instead of duplicating it.
+    optionxform = ConfigParser().optionxform
+    replacements = []
+    appended = []
+    for section, options in cfg_dict.items():
+        if section not in spans:
+            if options is not None:
+                appended.append(
+                    _format_cfg_section(section, {
+                        optionxform(option): value
+                        for option, value in options.items()
+                        if value is not None
+                    }))
+            continue
+
+        start, end = spans[section]
+        if options is None:
+            replacements.append((start, end, ''))
+            continue
+
+        config = ConfigParser()
+        config.read_string(text[start:end])
+        current = dict(config.items(section, raw=True))
+        merged = dict(current)
+        for option, value in options.items():
+            option = optionxform(option)
+            if value is None:
+                merged.pop(option, None)
+            else:
+                merged[option] = str(value)
+        if merged == current:
+            continue
+
+        old = text[start:end]
+        trailing = old[len(old.rstrip('\n')) + 1:]
+        replacements.append(
+            (start, end, _format_cfg_section(section, merged) + trailing))
+
+    if not replacements and not appended and text:
+        return
+
+    for start, end, new in sorted(replacements, reverse=True):
+        text = text[:start] + new + text[end:]
+    if appended and text and not text.endswith('\n'):
+        text += '\n'
+    text += ''.join(f'\n{section}' for section in appended)
+
+    _atomic_write(file, text)
+
+
+_cfg_cache = dict()
+_cfg_watchers = dict()
+
+
+def _parse_cfg(file: str) -> dict:
+    """Parses a .cfg file into a dictionary of sections and options."""
     from configparser import ConfigParser
 
     config = ConfigParser()
@@ -88,85 +194,791 @@ def read_cfg(file: str):
     return sections_dict
 
 
-def backup(file: str, output_path: str = '', backup_name: str = ''):
+def _snapshot_cfg(file: str) -> dict:
+    """Loads the parsed file from the binary snapshot stored next to it
+    (`<file>.snapshot`) when the snapshot still matches the source, parsing the
+    file and writing a new snapshot otherwise."""
+    import hashlib
+    import marshal
+    import os
+
+    tag = ('toolboxy-cfg', 1, marshal.version)
+    snapshot = f'{file}.snapshot'
+    try:
+        stat = os.stat(file)
+    except FileNotFoundError:
+        return _parse_cfg(file)
+
+    try:
+        with open(snapshot, 'rb') as f:
+            stored_tag, mtime_ns, size, digest, sections_dict = marshal.load(f)
+        if stored_tag != tag:
+            raise ValueError
+    except (OSError, EOFError, ValueError, TypeError):
+        mtime_ns, size, digest, sections_dict = None, None, None, None
+
+    if sections_dict is not None and (mtime_ns, size) == (stat.st_mtime_ns,
+                                                          stat.st_size):
+        return sections_dict
+
+    with open(file, 'rb') as f:
+        current = hashlib.sha1(f.read()).hexdigest()
+    if sections_dict is None or current != digest:
+        sections_dict = _parse_cfg(file)
+
+    try:
+        _atomic_write(
+            snapshot,
+            marshal.dumps((tag, stat.st_mtime_ns, stat.st_size, current,
+                           sections_dict)))
+    except OSError:
+        pass
+    return sections_dict
+
+
+def _cached_cfg(path: str, snapshot: bool = False) -> dict:
+    """Returns the parsed file from memory while its mtime and size are
+    unchanged, parsing it again otherwise."""
+    import os
+
+    parse = _snapshot_cfg if snapshot else _parse_cfg
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _cfg_cache.pop(path, None)
+        return _parse_cfg(path)
+
+    cached = _cfg_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    sections_dict = parse(path)
+    _cfg_cache[path] = (stat.st_mtime_ns, stat.st_size, sections_dict)
+    return sections_dict
+
+
+class LazyCfg(_Mapping):
+    """
+    English:
+    ----------
+    Read-only mapping over a .cfg file that parses each section only when it is accessed. Created by read_cfg(file, lazy=True).
+
+    Português (brasileiro):
+    ----------
+    Mapeamento somente leitura de um arquivo .cfg que lê cada seção apenas quando ela é acessada. Criado por read_cfg(file, lazy=True).
+    """
+
+    def __init__(self, file: str):
+        import locale
+        import mmap
+        import re
+
+        self.file = file
+        self.encoding = locale.getpreferredencoding(False)
+        self.sections = dict()
+        self.spans = dict()
+
+        with open(file, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    headers = [(match.start(), match.group(1))
+                               for match in re.finditer(
+                                   rb'^\[([^\r\n]+)\]', view, re.MULTILINE)]
+                    size = len(view)
+            except ValueError:
+                headers, size = [], 0
+
+        for n, (start, name) in enumerate(headers):
+            end = headers[n + 1][0] if n + 1 < len(headers) else size
+            self.spans.setdefault(name.decode(self.encoding),
+                                  []).append((start, end))
+        self.defaults = self.spans.pop('DEFAULT', [])
+
+    def _read(self, spans: list) -> str:
+        with open(self.file, 'rb') as f:
+            text = []
+            for start, end in spans:
+                f.seek(start)
+                text.append(f.read(end - start).decode(self.encoding))
+        return ''.join(text)
+
+    def __getitem__(self, section: str) -> dict:
+        if section not in self.sections:
+            from configparser import ConfigParser
+
+            config = ConfigParser()
+            config.read_string(self._read(self.defaults + self.spans[section]))
+            self.sections[section] = {
+                option: config.get(section, option)
+                for option in config.options(section)
+            }
+        return self.sections[section]
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+
+def read_cfg(file: str,
+             cache: bool = False,
+             lazy: bool = False,
+             snapshot: bool = False):
+    """
+    English:
+    ----------
+    Reads a .cfg configuration file and returns the options as a dictionary.
+
+    Parameters
+    ----------
+    file : str
+        The name of the configuration file to be read.
+    cache : bool, optional
+        If True, the parsed dictionary is kept in memory and returned again while the modification time and size of the file do not change. If the file is being watched (see watch_cfg), the file system is not accessed at all. The returned dictionary is shared and must not be modified. The default is False.
+    lazy : bool, optional
+        If True, only the position of each section is indexed and a LazyCfg mapping is returned, which parses a section when it is first accessed. Recommended for very large files. The default is False.
+    snapshot : bool, optional
+        If True, the parsed options are saved in a compact binary snapshot next to the file ('<file>.snapshot'), tagged with the hash, size and modification time of the file. Later calls load the snapshot instead of parsing the file while it is unchanged. The default is False.
+
+    Returns
+    -------
+    options : dict
+        A dictionary containing the options and their values, organized by section (a LazyCfg if `lazy` is True).
+
+    Português (brasileiro):
+    ----------
+    Lê um arquivo de configuração no formato .cfg e retorna as opções como um dicionário.
+
+    Parâmetros
+    ----------
+    file : str
+        O nome do arquivo de configuração a ser lido.
+    cache : bool, opcional
+        Se True, o dicionário lido é mantido em memória e retornado novamente enquanto a data de modificação e o tamanho do arquivo não mudarem. Se o arquivo estiver sendo monitorado (ver watch_cfg), o sistema de arquivos não é acessado. O dicionário retornado é compartilhado e não deve ser modificado. O padrão é False.
+    lazy : bool, opcional
+        Se True, apenas a posição de cada seção é indexada e é retornado um mapeamento LazyCfg, que lê uma seção quando ela é acessada pela primeira vez. Recomendado para arquivos muito grandes. O padrão é False.
+    snapshot : bool, opcional
+        Se True, as opções lidas são salvas em um snapshot binário compacto ao lado do arquivo ('<file>.snapshot'), identificado pelo hash, tamanho e data de modificação do arquivo. As chamadas seguintes carregam o snapshot em vez de ler o arquivo enquanto ele não for alterado. O padrão é False.
+
+    Retorna
+    -------
+    options : dict
+        Um dicionário contendo as opções e seus valores, organizados por seção (um LazyCfg se `lazy` for True).
+    """
+    if lazy:
+        return LazyCfg(file)
+    if not cache:
+        return _snapshot_cfg(file) if snapshot else _parse_cfg(file)
+
+    import os
+
+    path = os.path.abspath(file)
+    if path in _cfg_watchers and path in _cfg_cache:
+        return _cfg_cache[path][2]
+    return _cached_cfg(path, snapshot)
+
+
+def watch_cfg(file: str, callback=None, interval: float = 1.0):
+    """
+    English:
+    ----------
+    Watches a configuration file in a background thread, reloading it into the read_cfg cache when its modification time or size changes and calling the subscribed functions with the new options.
+
+    Parameters
+    ----------
+    file : str
+        The name of the configuration file to be watched.
+    callback : function, optional
+        Called as callback(options) after each reload. If the file is deleted, it is called once with an empty dictionary. The default is None (only keeps the cache up to date).
+    interval : float, optional
+        Time in seconds between checks of the file. The default is 1 second.
+
+    Returns
+    -------
+    None
+
+    Português (brasileiro):
+    ----------
+    Monitora um arquivo de configuração em uma thread em segundo plano, recarregando-o no cache do read_cfg quando a data de modificação ou o tamanho mudam e chamando as funções inscritas com as novas opções.
+
+    Parâmetros
+    ----------
+    file : str
+        O nome do arquivo de configuração a ser monitorado.
+    callback : function, opcional
+        Chamada como callback(opções) após cada recarga. Se o arquivo for apagado, é chamada uma vez com um dicionário vazio. O padrão é None (apenas mantém o cache atualizado).
+    interval : float, opcional
+        Tempo em segundos entre as verificações do arquivo. O padrão é 1 segundo.
+
+    Retorna
+    -------
+    None
+    """
+    import os
+    import threading
+
+    path = os.path.abspath(file)
+    watcher = _cfg_watchers.get(path)
+    if watcher is None:
+        _cached_cfg(path)
+        watcher = {'stop': threading.Event(), 'subscribers': []}
+
+        def state():
+            # (mtime, size) of the cached file, or None while it is missing.
+            cached = _cfg_cache.get(path)
+            return None if cached is None else cached[:2]
+
+        def poll():
+            from loguru import logger as log
+
+            delivered = state()
+            try:
+                while not watcher['stop'].wait(interval):
+                    try:
+                        options = _cached_cfg(path)
+                    except Exception as e:
+                        # Without a cache entry, cached reads parse the file
+                        # again instead of returning stale options.
+                        _cfg_cache.pop(path, None)
+                        log.exception(e)
+                        continue
+                    current = state()
+                    if current != delivered:
+                        delivered = current
+                        for subscriber in list(watcher['subscribers']):
+                            try:
+                                subscriber(options)
+                            except Exception as e:
+                                log.exception(e)
+            finally:
+                if _cfg_watchers.get(path) is watcher:
+                    del _cfg_watchers[path]
+
+        watcher['thread'] = threading.Thread(target=poll,
+                                             name=f'watch_cfg:{path}',
+                                             daemon=True)
+        _cfg_watchers[path] = watcher
+        watcher['thread'].start()
+
+    if callback is not None:
+        watcher['subscribers'].append(callback)
+
+
+def unwatch_cfg(file: str, callback=None):
+    """
+    English:
+    ----------
+    Stops watching a configuration file, or only removes one subscribed function.
+
+    Parameters
+    ----------
+    file : str
+        The name of the watched configuration file.
+    callback : function, optional
+        The function to be removed. If not provided, or if no functions remain, the watcher is stopped. The default is None.
+
+    Returns
+    -------
+    None
+
+    Português (brasileiro):
+    ----------
+    Interrompe o monitoramento de um arquivo de configuração, ou apenas remove uma função inscrita.
+
+    Parâmetros
+    ----------
+    file : str
+        O nome do arquivo de configuração monitorado.
+    callback : function, opcional
+        A função a ser removida. Se não for informada, ou se nenhuma função restar, o monitoramento é interrompido. O padrão é None.
+
+    Retorna
+    -------
+    None
+    """
+    import os
+
+    path = os.path.abspath(file)
+    watcher = _cfg_watchers.get(path)
+    if watcher is None:
+        return
+
+    if callback is not None and callback in watcher['subscribers']:
+        watcher['subscribers'].remove(callback)
+    if callback is None or not watcher['subscribers']:
+        _cfg_watchers.pop(path, None)
+        watcher['stop'].set()
+        watcher['thread'].join()
+
+
+def _fast_copy(source: str, destination: str) -> int:
+    """Copies a file letting the kernel move the data when possible: reflink
+    (FICLONE), then os.copy_file_range, then shutil.copyfile (which uses
+    sendfile/fcopyfile where available). Returns the number of bytes copied."""
+    import os
+    import shutil
+    import sys
+
+    with open(source, 'rb') as fsrc, open(destination, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if sys.platform.startswith('linux'):
+            try:
+                import fcntl
+
+                fcntl.ioctl(fdst.fileno(), 0x40049409, fsrc.fileno())
+                return size
+            except OSError:
+                pass
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(),
+                                         1073741824):
+                    pass
+                return size
+            except OSError:
+                pass
+
+    shutil.copyfile(source, destination)
+    return size
+
+
+def _copy_tree(source: str, destination: str, workers: int = None) -> tuple:
+    """Copies a directory tree from a thread pool, creating each destination
+    directory once beforehand. Symbolic links are recreated as links, even if
+    they point to directories or to nothing. Returns (number of files, bytes
+    copied, number of links, paths skipped)."""
+    import os
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+
+    copies = []
+    links = 0
+    skipped = []
+    directories = [(source, destination)]
+    while directories:
+        src_dir, dst_dir = directories.pop()
+        os.makedirs(dst_dir, exist_ok=True)
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                target = os.path.join(dst_dir, entry.name)
+                if entry.is_symlink():
+                    try:
+                        os.symlink(os.readlink(entry.path), target,
+                                   target_is_directory=entry.is_dir())
+                        links += 1
+                    except OSError:
+                        skipped.append(entry.path)
+                elif entry.is_dir():
+                    directories.append((entry.path, target))
+                elif entry.is_file():
+                    copies.append((entry.path, target))
+                else:
+                    skipped.append(entry.path)
+
+    def copy(pair):
+        size = _fast_copy(*pair)
+        shutil.copymode(*pair)
+        return size
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return len(copies), sum(executor.map(copy, copies)), links, skipped
+
+
+class _BlockCompressor:
+    """Write-only file object that compresses fixed-size blocks on a thread
+    pool and writes the compressed blocks to `output` in their original order."""
+
+    def __init__(self, output, compress, block_size: int, workers: int):
+        import os
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.output = output
+        self.compress = compress
+        self.block_size = block_size
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_pending = 2 * (workers or os.cpu_count() or 1)
+        self.pending = deque()
+        self.buffer = bytearray()
+
+    def _submit(self, block: bytes):
+        self.pending.append(self.executor.submit(self.compress, block))
+        while len(self.pending) > self.max_pending:
+            self.output.write(self.pending.popleft().result())
+
+    def write(self, data) -> int:
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self._submit(bytes(self.buffer[:self.block_size]))
+            del self.buffer[:self.block_size]
+        return len(data)
+
+    def close(self):
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer = bytearray()
+        while self.pending:
+            self.output.write(self.pending.popleft().result())
+        self.executor.shutdown()
+
+
+def _compressed_archive(source: str, destination: str, compression: str,
+                        level: int, workers: int) -> tuple:
+    """Streams `source` into a tar archive compressed block by block (gzip
+    members or xz streams, which can be concatenated) or with zstandard's own
+    threads. Returns (number of files, bytes read)."""
+    import os
+    import tarfile
+
+    count = [0, 0]
+
+    def counter(info):
+        if info.isfile():
+            count[0] += 1
+            count[1] += info.size
+        return info
+
+    with open(destination, 'wb') as output:
+        if compression == 'gz':
+            import gzip
+
+            level = 6 if level is None else level
+            writer = _BlockCompressor(
+                output, lambda block: gzip.compress(
+                    block, compresslevel=level, mtime=0), 1048576, workers)
+        elif compression == 'xz':
+            import lzma
+
+            level = 6 if level is None else level
+            writer = _BlockCompressor(
+                output, lambda block: lzma.compress(block, preset=level),
+                4194304, workers)
+        elif compression == 'zst':
+            import zstandard
+
+            writer = zstandard.ZstdCompressor(
+                level=3 if level is None else level,
+                threads=workers or -1).stream_writer(output, closefd=False)
+        else:
+            raise ValueError(
+                "Compressão inválida. Opções: 'gz', 'xz' ou 'zst'")
+
+        with tarfile.open(fileobj=writer, mode='w|') as archive:
+            archive.add(source,
+                        arcname=os.path.basename(os.path.normpath(source)),
+                        filter=counter)
+        writer.close()
+
+    return count[0], count[1]
+
+
+def backup(file: str,
+           output_path: str = '',
+           backup_name: str = '',
+           workers: int = None,
+           compression: str = '',
+           level: int = None) -> dict:
     """
     English:
     ----------
-    Makes a backup of a file.
+    Makes a backup of a file or of a whole directory. Data is copied by the operating system kernel when possible (reflink, copy_file_range or sendfile), and the files of a directory are copied in parallel. If `compression` is given, the backup is instead written as a single compressed tar archive, read once and compressed on all cores.
 
     Parameters
     ----------
     file : str
-        The path to the file that will be copied.
+        The path to the file or directory that will be copied.
     output_path : str
         The path where the backup will be saved. The default is an empty string.
     backup_name : str
         The name of the backup. If not provided, the name will be the current date and time.
+    workers : int, optional
+        Number of threads used to copy the files of a directory or to compress the archive. The default is chosen by ThreadPoolExecutor.
+    compression : str, optional
+        Archive compression: 'gz', 'xz' or 'zst' (requires the 'zstandard' package). The extension '.tar.<compression>' is added to the backup name. The default is an empty string (plain copy).
+    level : int, optional
+        Compression level. Lower levels are faster, higher levels produce smaller archives. The default is 6 for 'gz' and 'xz' and 3 for 'zst'.
 
     Returns
     -------
-    None
+    dict
+        A summary with the number of files copied ('files'), the bytes copied ('bytes'), the elapsed time in seconds ('seconds') and the throughput in bytes per second ('throughput'). Compressed backups also include the archive size ('compressed'). Directory copies also include the number of symbolic links recreated as links ('links') and the paths that could not be copied, such as sockets or links the system refused to create ('skipped').
 
     Português (brasileiro):
     ----------
-    Realiza uma cópia de segurança de um arquivo.
+    Realiza uma cópia de segurança de um arquivo ou de um diretório inteiro. Os dados são copiados pelo kernel do sistema operacional quando possível (reflink, copy_file_range ou sendfile), e os arquivos de um diretório são copiados em paralelo. Se `compression` for informado, a cópia é gravada como um único arquivo tar compactado, lido uma única vez e compactado em todos os núcleos.
 
     Parâmetros
     ----------
     file : str
-        O caminho para o arquivo que será copiado.
+        O caminho para o arquivo ou diretório que será copiado.
     output_path : str
         O caminho onde a cópia de segurança será salva. O padrão é uma string vazia.
     backup_name : str
         O nome da cópia de segurança. Se não for informado, o nome será a data e hora atual.
+    workers : int, opcional
+        Número de threads usadas para copiar os arquivos de um diretório ou para compactar o arquivo. O padrão é definido pelo ThreadPoolExecutor.
+    compression : str, opcional
+        Compressão do arquivo: 'gz', 'xz' ou 'zst' (requer o pacote 'zstandard'). A extensão '.tar.<compression>' é adicionada ao nome da cópia. O padrão é uma string vazia (cópia simples).
+    level : int, opcional
+        Nível de compressão. Níveis menores são mais rápidos, níveis maiores geram arquivos menores. O padrão é 6 para 'gz' e 'xz' e 3 para 'zst'.
 
     Retorna
     -------
-    None
+    dict
+        Um resumo com o número de arquivos copiados ('files'), os bytes copiados ('bytes'), o tempo decorrido em segundos ('seconds') e a taxa de transferência em bytes por segundo ('throughput'). Cópias compactadas também incluem o tamanho do arquivo gerado ('compressed'). Cópias de diretórios também incluem o número de links simbólicos recriados como links ('links') e os caminhos que não puderam ser copiados, como sockets ou links que o sistema não permitiu criar ('skipped').
     """
+    import os
     import shutil
+    import time
+
+    is_directory = os.path.isdir(file)
 
     if backup_name == '':
         from datetime import datetime
 
         try:
-            extension = file[file.rindex('.'):]
+            extension = '' if is_directory or compression else file[
+                file.rindex('.'):]
         except ValueError:
             extension = ''
 
         backup_name = datetime.now().strftime("%Y-%m-%d %Hh%M") + extension
 
-    if len(output_path) > 0 and (output_path[-1] != '\\'
-                                 or output_path[-1] != '/'):
-        output_path += '/'
-
-    try:
-        shutil.copy(file, output_path + backup_name)
-    except FileNotFoundError:
+    if len(output_path) > 0:
         try:
-            import os
-
-            os.makedirs(output_path)
+            os.makedirs(output_path, exist_ok=True)
         except PermissionError:
             print(
                 'Caminho informado não existe. Criação de diretório não foi autorizado.\nAjuste a permissão do algoritmo ou crie manualmente a pasta de destino.'
             )
-    finally:
-        shutil.copy(file, output_path + backup_name)
+            raise
+
+    destination = os.path.join(output_path, backup_name)
+    start = time.perf_counter()
+    if compression:
+        destination += f'.tar.{compression}'
+        files, size = _compressed_archive(file, destination, compression,
+                                          level, workers)
+    elif is_directory:
+        files, size, links, skipped = _copy_tree(file, destination,
+                                                 workers)
+    else:
+        files, size = 1, _fast_copy(file, destination)
+        shutil.copymode(file, destination)
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        'files': files,
+        'bytes': size,
+        'seconds': elapsed,
+        'throughput': size / elapsed if elapsed > 0 else 0.0
+    }
+    if compression:
+        summary['compressed'] = os.stat(destination).st_size
+    elif is_directory:
+        summary['links'] = links
+        summary['skipped'] = skipped
+    return summary
+
+
+def _new_hasher(sha: int | str):
+    """Returns a new hash object for the algorithm identified by `sha`."""
+    import hashlib
+
+    hashers = {
+        1: hashlib.sha1,
+        224: hashlib.sha224,
+        256: hashlib.sha256,
+        384: hashlib.sha384,
+        'blake2b': hashlib.blake2b
+    }
+
+    return hashers[sha]()
+
+
+def _hash_file(file: str,
+               sha: int | str = 1,
+               chunk_size: int = 1048576,
+               progress=None,
+               cancel=None):
+    """Hashes a file in fixed-size chunks read into a single reused buffer.
+    Returns None if the `cancel` event is set before the file is fully read."""
+    import os
+    import time
+
+    if chunk_size <= 0:
+        raise ValueError('chunk_size deve ser maior que zero')
+    hasher = _new_hasher(sha)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+
+    with open(file, 'rb', buffering=0) as f:
+        total = os.fstat(f.fileno()).st_size
+        done = 0
+        start = time.perf_counter()
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            if cancel is not None and cancel.is_set():
+                return None
+            hasher.update(view[:read])
+            done += read
+            if progress is not None:
+                elapsed = time.perf_counter() - start
+                progress(file, done, total,
+                         done / elapsed if elapsed > 0 else 0.0)
+
+    return hasher
+
+
+class _HashCache:
+    """SQLite index of digests keyed by (device, inode, size, mtime_ns, algorithm).
+    Each write is committed at once, so concurrent runs sharing the cache do
+    not wait for each other; `max_entries=None` skips eviction on close."""
+
+    def __init__(self, path: str, max_entries: int | None = 100000):
+        import sqlite3
+        import threading
 
-# Todo: Docstrings
-def check_hash(*files, sha: int = 1):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path,
+                                          timeout=30,
+                                          check_same_thread=False)
+        self.connection.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS hashes (
+                device INTEGER, inode INTEGER, algorithm TEXT,
+                size INTEGER, mtime_ns INTEGER, digest TEXT,
+                path TEXT, last_used REAL,
+                PRIMARY KEY (device, inode, algorithm));
+            CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used);
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY, value INTEGER);
+            INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0);
+        ''')
+
+    def get(self, stat, sha) -> str:
+        import time
+
+        with self.lock:
+            row = self.connection.execute(
+                '''SELECT size, mtime_ns, digest FROM hashes
+                   WHERE device = ? AND inode = ? AND algorithm = ?''',
+                (stat.st_dev, stat.st_ino, str(sha))).fetchone()
+            if row is not None and row[:2] == (stat.st_size,
+                                               stat.st_mtime_ns):
+                self.hits += 1
+                self.connection.execute(
+                    '''UPDATE hashes SET last_used = ?
+                       WHERE device = ? AND inode = ? AND algorithm = ?''',
+                    (time.time(), stat.st_dev, stat.st_ino, str(sha)))
+                self.connection.commit()
+                return row[2]
+            self.misses += 1
+            return None
+
+    def put(self, file, stat, sha, digest):
+        import os
+        import time
+
+        # A file modified while it was hashed, or within the last second
+        # (where a later write could keep the same mtime), is not cached.
+        now = time.time()
+        current = os.stat(file)
+        if ((current.st_size, current.st_mtime_ns) !=
+            (stat.st_size, stat.st_mtime_ns)
+                or now - current.st_mtime_ns / 1e9 < 1):
+            return
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (stat.st_dev, stat.st_ino, str(sha), stat.st_size,
+                 stat.st_mtime_ns, digest, os.path.abspath(file), now))
+            self.connection.commit()
+
+    def close(self):
+        with self.connection:
+            self.connection.execute(
+                'UPDATE stats SET value = value + ? WHERE name = ?',
+                (self.hits, 'hits'))
+            self.connection.execute(
+                'UPDATE stats SET value = value + ? WHERE name = ?',
+                (self.misses, 'misses'))
+            if self.max_entries is not None:
+                self.connection.execute(
+                    '''DELETE FROM hashes WHERE rowid IN (
+                           SELECT rowid FROM hashes ORDER BY last_used DESC
+                           LIMIT -1 OFFSET ?)''', (self.max_entries, ))
+        self.connection.close()
+
+
+def _file_digest(file: str,
+                 sha: int | str = 1,
+                 chunk_size: int = 1048576,
+                 progress=None,
+                 cancel=None,
+                 cache: _HashCache = None,
+                 tree_chunk: int = 0) -> str:
+    """Returns the hexadecimal hash of a file, using `cache` when possible."""
+    algorithm = f'{sha}/tree{tree_chunk}' if tree_chunk else sha
+    if cache is not None:
+        import os
+
+        stat = os.stat(file)
+        digest = cache.get(stat, algorithm)
+        if digest is not None:
+            return digest
+
+    if tree_chunk:
+        digest = tree_hash(file, tree_chunk, sha, buffer_size=chunk_size)
+    else:
+        hasher = _hash_file(file, sha, chunk_size, progress, cancel)
+        if hasher is None:
+            return None
+        digest = hasher.hexdigest()
+
+    if cache is not None:
+        cache.put(file, stat, algorithm, digest)
+    return digest
+
+
+def check_hash(*files,
+               sha: int | str = 1,
+               chunk_size: int = 1048576,
+               progress=None,
+               workers: int = None,
+               cache: str = '',
+               cache_size: int = 100000,
+               tree_chunk: int = 0):
     """
     English:
     ----------
-    Checks the hash of one or more files.
+    Checks the hash of one or more files. Files are read in chunks of `chunk_size` bytes into a reused buffer, so memory usage does not depend on the file size. When several files are given, their sizes are compared first and the files are then hashed in parallel, stopping as soon as one hash differs.
 
     Parameters
     ----------
     files : str
         File or files to be checked.
-    sha : int
-        Hash algorithm.
+    sha : int or str
+        Hash algorithm: 1, 224, 256, 384 or 'blake2b'.
+    chunk_size : int, optional
+        Size in bytes of each chunk read from the file. The default is 1 MiB.
+    progress : function, optional
+        Called after each chunk as progress(file, bytes_read, total_bytes, bytes_per_second).
+    workers : int, optional
+        Number of threads used to hash several files. The default is chosen by ThreadPoolExecutor.
+    cache : str, optional
+        Path to a SQLite database used as a persistent hash cache. Unchanged files (same device, inode, size and modification time) are not read again. The default is an empty string (no cache).
+    cache_size : int, optional
+        Maximum number of entries kept in the cache. The least recently used entries are removed first. The default is 100000.
+    tree_chunk : int, optional
+        If greater than zero, each file is hashed with tree_hash using chunks of this size (in bytes), in parallel on all cores. The progress callback is not called in this mode. The default is 0 (linear hash).
 
     Returns
     -------
@@ -177,14 +989,26 @@ def check_hash(*files, sha: int = 1):
 
     Português (brasileiro):
     ----------
-    Verifica o hash de um ou mais arquivos.
+    Verifica o hash de um ou mais arquivos. Os arquivos são lidos em blocos de `chunk_size` bytes em um buffer reaproveitado, de modo que o uso de memória não depende do tamanho do arquivo. Quando vários arquivos são informados, os tamanhos são comparados primeiro e os arquivos são então processados em paralelo, parando assim que um hash for diferente.
 
     Parâmetros
     ----------
     files : str
         Arquivo ou arquivos a serem verificados.
-    sha : int
-        Algoritmo de hash.
+    sha : int ou str
+        Algoritmo de hash: 1, 224, 256, 384 ou 'blake2b'.
+    chunk_size : int, opcional
+        Tamanho em bytes de cada bloco lido do arquivo. O padrão é 1 MiB.
+    progress : function, opcional
+        Chamada após cada bloco como progress(arquivo, bytes_lidos, total_de_bytes, bytes_por_segundo).
+    workers : int, opcional
+        Número de threads usadas para processar vários arquivos. O padrão é definido pelo ThreadPoolExecutor.
+    cache : str, opcional
+        Caminho para um banco de dados SQLite usado como cache persistente de hashes. Arquivos inalterados (mesmo dispositivo, inode, tamanho e data de modificação) não são lidos novamente. O padrão é uma string vazia (sem cache).
+    cache_size : int, opcional
+        Número máximo de entradas mantidas no cache. As entradas usadas há mais tempo são removidas primeiro. O padrão é 100000.
+    tree_chunk : int, opcional
+        Se maior que zero, cada arquivo é processado com tree_hash usando blocos desse tamanho (em bytes), em paralelo em todos os núcleos. A função de progresso não é chamada nesse modo. O padrão é 0 (hash linear).
 
     Retorna
     -------
@@ -193,33 +1017,905 @@ def check_hash(*files, sha: int = 1):
     str
         Hash do arquivo.
     """
-    import hashlib
+    hash_cache = _HashCache(cache, cache_size) if cache else None
+    try:
+        if len(files) > 1:
+            import os
+            import threading
+            from concurrent.futures import ThreadPoolExecutor, as_completed
 
-    hashers = {
-        1: hashlib.sha1,
-        224: hashlib.sha224,
-        256: hashlib.sha256,
-        384: hashlib.sha384
-    }
+            if len({os.stat(file).st_size for file in files}) > 1:
+                return False
 
-    if len(files) > 1:
-        for file in files:
-            with open(file, 'rb') as f:
-                hasher = hashers[sha]()
-                hasher.update(f.read())
-                try:
-                    if hash == hasher.digest():
-                        continue
-                    else:
+            cancel = threading.Event()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_file_digest, file, sha, chunk_size,
+                                    progress, cancel, hash_cache, tree_chunk)
+                    for file in files
+                ]
+                digest = None
+                for future in as_completed(futures):
+                    current = future.result()
+                    if digest is None:
+                        digest = current
+                    elif current != digest:
+                        cancel.set()
+                        for pending in futures:
+                            pending.cancel()
                         return False
-                except UnboundLocalError:
-                    hash = hasher.digest()
-                    continue
-        return True
+            return True
 
-    else:
-        with open(files[0], 'rb') as f:
-            hasher = hashers[sha]()
-            hasher.update(f.read())
-            hash = hasher.hexdigest()
-            return hash
\ No newline at end of file
+        else:
+            return _file_digest(files[0],
+                                sha,
+                                chunk_size,
+                                progress,
+                                cache=hash_cache,
+                                tree_chunk=tree_chunk)
+    finally:
+        if hash_cache is not None:
+            hash_cache.close()
+
+
+def hash_files(files,
+               sha: int | str = 1,
+               chunk_size: int = 1048576,
+               progress=None,
+               workers: int = None,
+               cache: str = '',
+               cache_size: int = 100000) -> dict:
+    """
+    English:
+    ----------
+    Calculates the hash of many files in parallel.
+
+    Parameters
+    ----------
+    files : iterable
+        Paths of the files to be hashed.
+    sha : int or str, optional
+        Hash algorithm: 1, 224, 256, 384 or 'blake2b'. The default is 1.
+    chunk_size : int, optional
+        Size in bytes of each chunk read from the files. The default is 1 MiB.
+    progress : function, optional
+        Called after each chunk as progress(file, bytes_read, total_bytes, bytes_per_second).
+    workers : int, optional
+        Number of threads used. The default is chosen by ThreadPoolExecutor.
+    cache : str, optional
+        Path to a SQLite database used as a persistent hash cache (see check_hash). The default is an empty string (no cache).
+    cache_size : int, optional
+        Maximum number of entries kept in the cache. The default is 100000.
+
+    Returns
+    -------
+    dict
+        A dictionary mapping each path to its hexadecimal hash.
+
+    Português (brasileiro):
+    ----------
+    Calcula o hash de vários arquivos em paralelo.
+
+    Parâmetros
+    ----------
+    files : iterable
+        Caminhos dos arquivos a serem processados.
+    sha : int ou str, opcional
+        Algoritmo de hash: 1, 224, 256, 384 ou 'blake2b'. O padrão é 1.
+    chunk_size : int, opcional
+        Tamanho em bytes de cada bloco lido dos arquivos. O padrão é 1 MiB.
+    progress : function, opcional
+        Chamada após cada bloco como progress(arquivo, bytes_lidos, total_de_bytes, bytes_por_segundo).
+    workers : int, opcional
+        Número de threads utilizadas. O padrão é definido pelo ThreadPoolExecutor.
+    cache : str, opcional
+        Caminho para um banco de dados SQLite usado como cache persistente de hashes (ver check_hash). O padrão é uma string vazia (sem cache).
+    cache_size : int, opcional
+        Número máximo de entradas mantidas no cache. O padrão é 100000.
+
+    Retorna
+    -------
+    dict
+        Um dicionário que associa cada caminho ao seu hash hexadecimal.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    files = list(files)
+    hash_cache = _HashCache(cache, cache_size) if cache else None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            digests = executor.map(
+                lambda file: _file_digest(
+                    file, sha, chunk_size, progress, cache=hash_cache), files)
+            return dict(zip(files, digests))
+    finally:
+        if hash_cache is not None:
+            hash_cache.close()
+
+
+def hash_cache_stats(cache: str) -> dict:
+    """
+    English:
+    ----------
+    Returns the statistics of a persistent hash cache created by check_hash or hash_files.
+
+    Parameters
+    ----------
+    cache : str
+        Path to the SQLite cache database.
+
+    Returns
+    -------
+    dict
+        A dictionary with the number of entries, hits and misses of the cache.
+
+    Português (brasileiro):
+    ----------
+    Retorna as estatísticas de um cache persistente de hashes criado por check_hash ou hash_files.
+
+    Parâmetros
+    ----------
+    cache : str
+        Caminho para o banco de dados SQLite do cache.
+
+    Retorna
+    -------
+    dict
+        Um dicionário com o número de entradas, acertos (hits) e falhas (misses) do cache.
+    """
+    hash_cache = _HashCache(cache, max_entries=None)
+    try:
+        stats = dict(
+            hash_cache.connection.execute('SELECT name, value FROM stats'))
+        stats['entries'] = hash_cache.connection.execute(
+            'SELECT COUNT(*) FROM hashes').fetchone()[0]
+        return stats
+    finally:
+        hash_cache.close()
+
+
+def clear_hash_cache(cache: str, missing_only: bool = False) -> int:
+    """
+    English:
+    ----------
+    Removes entries from a persistent hash cache.
+
+    Parameters
+    ----------
+    cache : str
+        Path to the SQLite cache database.
+    missing_only : bool, optional
+        If True, only removes entries whose files no longer exist or have changed. The default is False (removes every entry and resets the counters).
+
+    Returns
+    -------
+    int
+        The number of removed entries.
+
+    Português (brasileiro):
+    ----------
+    Remove entradas de um cache persistente de hashes.
+
+    Parâmetros
+    ----------
+    cache : str
+        Caminho para o banco de dados SQLite do cache.
+    missing_only : bool, opcional
+        Se True, remove apenas as entradas cujos arquivos não existem mais ou foram alterados. O padrão é False (remove todas as entradas e zera os contadores).
+
+    Retorna
+    -------
+    int
+        O número de entradas removidas.
+    """
+    import os
+
+    hash_cache = _HashCache(cache, max_entries=None)
+    try:
+        with hash_cache.connection as connection:
+            if not missing_only:
+                connection.execute('UPDATE stats SET value = 0')
+                return connection.execute('DELETE FROM hashes').rowcount
+
+            stale = []
+            for row in connection.execute(
+                    '''SELECT device, inode, size, mtime_ns, path
+                       FROM hashes''').fetchall():
+                try:
+                    stat = os.stat(row[4])
+                    if (stat.st_dev, stat.st_ino, stat.st_size,
+                            stat.st_mtime_ns) == row[:4]:
+                        continue
+                except OSError:
+                    pass
+                stale.append(row[:2])
+            connection.executemany(
+                'DELETE FROM hashes WHERE device = ? AND inode = ?', stale)
+            return len(stale)
+    finally:
+        hash_cache.close()
+
+
+def _partial_digest(file: str, size: int, sha: int | str,
+                    block_size: int) -> bytes:
+    """Hashes only the first and last `block_size` bytes of a file."""
+    hasher = _new_hasher(sha)
+    with open(file, 'rb') as f:
+        hasher.update(f.read(block_size))
+        if size > block_size:
+            f.seek(max(block_size, size - block_size))
+            hasher.update(f.read(block_size))
+    return hasher.digest()
+
+
+def find_duplicates(*roots,
+                    sha: int | str = 1,
+                    block_size: int = 65536,
+                    min_size: int = 1,
+                    workers: int = None):
+    """
+    English:
+    ----------
+    Finds duplicate files in one or more directory trees. Files are first grouped by size, then by the hash of their first and last blocks, and only the files that remain in a group are fully hashed. The same file reached more than once (hard links or overlapping roots) is reported only once.
+
+    Parameters
+    ----------
+    roots : str
+        Directories to be searched.
+    sha : int or str, optional
+        Hash algorithm: 1, 224, 256, 384 or 'blake2b'. The default is 1.
+    block_size : int, optional
+        Size in bytes of the first and last blocks used in the partial hash. The default is 64 KiB.
+    min_size : int, optional
+        Files smaller than this size (in bytes) are ignored. The default is 1 (ignores empty files).
+    workers : int, optional
+        Number of threads used for the full hashes. The default is chosen by ThreadPoolExecutor.
+
+    Yields
+    -------
+    list
+        A list with the paths of files that have the same content.
+
+    Português (brasileiro):
+    ----------
+    Encontra arquivos duplicados em uma ou mais árvores de diretórios. Os arquivos são agrupados primeiro pelo tamanho, depois pelo hash do primeiro e do último bloco, e somente os arquivos que continuam em um grupo têm o hash completo calculado. Um mesmo arquivo encontrado mais de uma vez (hard links ou diretórios sobrepostos) é informado apenas uma vez.
+
+    Parâmetros
+    ----------
+    roots : str
+        Diretórios a serem percorridos.
+    sha : int ou str, opcional
+        Algoritmo de hash: 1, 224, 256, 384 ou 'blake2b'. O padrão é 1.
+    block_size : int, opcional
+        Tamanho em bytes do primeiro e do último bloco usados no hash parcial. O padrão é 64 KiB.
+    min_size : int, opcional
+        Arquivos menores que esse tamanho (em bytes) são ignorados. O padrão é 1 (ignora arquivos vazios).
+    workers : int, opcional
+        Número de threads usadas nos hashes completos. O padrão é definido pelo ThreadPoolExecutor.
+
+    Gera
+    -------
+    list
+        Uma lista com os caminhos dos arquivos que possuem o mesmo conteúdo.
+    """
+    import os
+
+    by_size = dict()
+    seen = set()
+    directories = list(roots)
+    while directories:
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        if stat.st_size < min_size:
+                            continue
+                        if entry.inode():
+                            identity = (stat.st_dev, entry.inode())
+                        else:
+                            identity = os.path.normcase(
+                                os.path.abspath(entry.path))
+                        if identity in seen:
+                            continue
+                        seen.add(identity)
+                        by_size.setdefault(stat.st_size, []).append(entry.path)
+        except (PermissionError, FileNotFoundError):
+            continue
+    del seen
+
+    for size in list(by_size):
+        files = by_size.pop(size)
+        if len(files) < 2:
+            continue
+
+        by_partial = dict()
+        for file in files:
+            by_partial.setdefault(
+                _partial_digest(file, size, sha, block_size), []).append(file)
+
+        for candidates in by_partial.values():
+            if len(candidates) < 2:
+                continue
+            if size <= 2 * block_size:
+                yield candidates
+                continue
+
+            by_digest = dict()
+            for file, digest in hash_files(candidates, sha,
+                                           workers=workers).items():
+                by_digest.setdefault(digest, []).append(file)
+            for duplicates in by_digest.values():
+                if len(duplicates) > 1:
+                    yield duplicates
+
+
+def _hash_range(file: str, offset: int, length: int, sha: int | str,
+                buffer_size: int) -> bytes:
+    """Hashes `length` bytes of a file starting at `offset` (a Merkle leaf)."""
+    hasher = _new_hasher(sha)
+    hasher.update(b'\x00')
+    buffer = bytearray(min(buffer_size, max(length, 1)))
+    view = memoryview(buffer)
+
+    with open(file, 'rb', buffering=0) as f:
+        f.seek(offset)
+        while length > 0:
+            read = f.readinto(view[:min(length, len(buffer))])
+            if not read:
+                break
+            hasher.update(view[:read])
+            length -= read
+
+    return hasher.digest()
+
+
+def _merkle_root(leaves: list, sha: int | str) -> bytes:
+    """Combines leaf digests pairwise until a single root digest remains."""
+    level = leaves
+    while len(level) > 1:
+        parents = []
+        for n in range(0, len(level) - 1, 2):
+            hasher = _new_hasher(sha)
+            hasher.update(b'\x01' + level[n] + level[n + 1])
+            parents.append(hasher.digest())
+        if len(level) % 2:
+            parents.append(level[-1])
+        level = parents
+    return level[0]
+
+
+def tree_hash(file: str,
+              chunk_size: int = 8388608,
+              sha: int | str = 'blake2b',
+              workers: int = None,
+              leaves: bool = False,
+              buffer_size: int = 1048576):
+    """
+    English:
+    ----------
+    Calculates a Merkle tree hash of a file. The file is split into chunks of `chunk_size` bytes that are hashed in parallel, and the chunk hashes are combined pairwise up to a single root hash. The result is deterministic for a given chunk size and algorithm, but differs from the linear hash returned by check_hash.
+
+    Parameters
+    ----------
+    file : str
+        The path to the file.
+    chunk_size : int, optional
+        Size in bytes of each chunk. The default is 8 MiB.
+    sha : int or str, optional
+        Hash algorithm: 1, 224, 256, 384 or 'blake2b'. The default is 'blake2b'.
+    workers : int, optional
+        Number of threads used. The default is the number of CPUs.
+    leaves : bool, optional
+        If True, also returns the hash of each chunk, which can later be checked with verify_chunk. The default is False.
+    buffer_size : int, optional
+        Size in bytes of the buffer used to read each chunk. The default is 1 MiB.
+
+    Returns
+    -------
+    str
+        The root hash.
+    tuple
+        (root hash, list of chunk hashes), if `leaves` is True.
+
+    Português (brasileiro):
+    ----------
+    Calcula o hash em árvore de Merkle de um arquivo. O arquivo é dividido em blocos de `chunk_size` bytes processados em paralelo, e os hashes dos blocos são combinados em pares até restar um único hash raiz. O resultado é determinístico para um mesmo tamanho de bloco e algoritmo, mas difere do hash linear retornado por check_hash.
+
+    Parâmetros
+    ----------
+    file : str
+        O caminho para o arquivo.
+    chunk_size : int, opcional
+        Tamanho em bytes de cada bloco. O padrão é 8 MiB.
+    sha : int ou str, opcional
+        Algoritmo de hash: 1, 224, 256, 384 ou 'blake2b'. O padrão é 'blake2b'.
+    workers : int, opcional
+        Número de threads utilizadas. O padrão é o número de CPUs.
+    leaves : bool, opcional
+        Se True, também retorna o hash de cada bloco, que pode ser verificado depois com verify_chunk. O padrão é False.
+    buffer_size : int, opcional
+        Tamanho em bytes do buffer usado para ler cada bloco. O padrão é 1 MiB.
+
+    Retorna
+    -------
+    str
+        O hash raiz.
+    tuple
+        (hash raiz, lista com os hashes dos blocos), se `leaves` for True.
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+
+    size = os.stat(file).st_size
+    offsets = range(0, max(size, 1), chunk_size)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        digests = list(
+            executor.map(
+                lambda offset: _hash_range(file, offset, chunk_size, sha,
+                                           buffer_size), offsets))
+
+    root = _merkle_root(digests, sha).hex()
+    if leaves:
+        return root, [digest.hex() for digest in digests]
+    return root
+
+
+def verify_chunk(file: str,
+                 index: int,
+                 digest: str,
+                 chunk_size: int = 8388608,
+                 sha: int | str = 'blake2b') -> bool:
+    """
+    English:
+    ----------
+    Checks a single chunk of a file against its hash from tree_hash, without reading the rest of the file.
+
+    Parameters
+    ----------
+    file : str
+        The path to the file.
+    index : int
+        The index of the chunk (starting at 0).
+    digest : str
+        The expected hash of the chunk, as returned by tree_hash(..., leaves=True).
+    chunk_size : int, optional
+        Size in bytes of each chunk. Must be the same used in tree_hash. The default is 8 MiB.
+    sha : int or str, optional
+        Hash algorithm. Must be the same used in tree_hash. The default is 'blake2b'.
+
+    Returns
+    -------
+    bool
+        True if the chunk is intact.
+
+    Português (brasileiro):
+    ----------
+    Verifica um único bloco de um arquivo em relação ao seu hash obtido por tree_hash, sem ler o restante do arquivo.
+
+    Parâmetros
+    ----------
+    file : str
+        O caminho para o arquivo.
+    index : int
+        O índice do bloco (começando em 0).
+    digest : str
+        O hash esperado do bloco, conforme retornado por tree_hash(..., leaves=True).
+    chunk_size : int, opcional
+        Tamanho em bytes de cada bloco. Deve ser o mesmo usado em tree_hash. O padrão é 8 MiB.
+    sha : int ou str, opcional
+        Algoritmo de hash. Deve ser o mesmo usado em tree_hash. O padrão é 'blake2b'.
+
+    Retorna
+    -------
+    bool
+        True se o bloco estiver íntegro.
+    """
+    return _hash_range(file, index * chunk_size, chunk_size, sha,
+                       1048576).hex() == digest
+
+
+def _store_chunks(file: str, store: str, chunk_size: int,
+                  sha: int | str) -> list:
+    """Splits a file into chunks, writes the ones missing from the store and
+    returns the list of chunk hashes."""
+    import os
+    import threading
+
+    chunks = []
+    with open(file, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data and chunks:
+                break
+            hasher = _new_hasher(sha)
+            hasher.update(data)
+            digest = hasher.hexdigest()
+            chunks.append(digest)
+
+            path = os.path.join(store, 'chunks', digest[:2], digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                with open(temp, 'wb') as chunk:
+                    chunk.write(data)
+                os.replace(temp, path)
+            if len(data) < chunk_size:
+                break
+    return chunks
+
+
+class _StoreLock:
+    """Lock file of a backup store, held shared by incremental_backup and
+    restore_backup and exclusively by gc_backups, so a collection never
+    removes chunks of a snapshot that is still being written or read. Uses
+    flock where available; elsewhere every holder takes it exclusively."""
+
+    def __init__(self, store: str, exclusive: bool):
+        import os
+
+        self.path = os.path.join(store, 'lock')
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        self.file = open(self.path, 'a+b')
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+
+            while True:
+                try:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        else:
+            fcntl.flock(self.file.fileno(),
+                        fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, *args):
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+
+
+def _read_manifest(store: str, snapshot: str) -> dict:
+    """Loads the manifest of a snapshot from the store."""
+    import json
+    import os
+
+    with open(os.path.join(store, 'snapshots', f'{snapshot}.json'),
+              'r',
+              encoding='utf-8') as f:
+        return json.load(f)
+
+
+def incremental_backup(source: str,
+                       store: str,
+                       chunk_size: int = 4194304,
+                       sha: int | str = 'blake2b',
+                       workers: int = None) -> str:
+    """
+    English:
+    ----------
+    Makes an incremental backup of a file or directory into a local content-addressed store. Files are split into chunks that are stored only once under their hash, and each snapshot is recorded as a small manifest. Files whose size and modification time did not change since the previous snapshot are not read again, so a new snapshot only costs the changed data. Symbolic links are recorded as links and recreated by restore_backup.
+
+    Parameters
+    ----------
+    source : str
+        The path to the file or directory that will be copied.
+    store : str
+        The directory of the backup store. It is created if it does not exist.
+    chunk_size : int, optional
+        Size in bytes of each chunk. The default is 4 MiB.
+    sha : int or str, optional
+        Hash algorithm used to identify the chunks. The default is 'blake2b'.
+    workers : int, optional
+        Number of threads used to read the files. The default is chosen by ThreadPoolExecutor.
+
+    Returns
+    -------
+    str
+        The identifier of the new snapshot.
+
+    Português (brasileiro):
+    ----------
+    Realiza uma cópia de segurança incremental de um arquivo ou diretório em um repositório local endereçado por conteúdo. Os arquivos são divididos em blocos armazenados uma única vez sob o seu hash, e cada snapshot é registrado em um pequeno manifesto. Arquivos cujo tamanho e data de modificação não mudaram desde o snapshot anterior não são lidos novamente, de modo que um novo snapshot custa apenas os dados alterados. Links simbólicos são registrados como links e recriados por restore_backup.
+
+    Parâmetros
+    ----------
+    source : str
+        O caminho para o arquivo ou diretório que será copiado.
+    store : str
+        O diretório do repositório de cópias. É criado caso não exista.
+    chunk_size : int, opcional
+        Tamanho em bytes de cada bloco. O padrão é 4 MiB.
+    sha : int ou str, opcional
+        Algoritmo de hash usado para identificar os blocos. O padrão é 'blake2b'.
+    workers : int, opcional
+        Número de threads usadas para ler os arquivos. O padrão é definido pelo ThreadPoolExecutor.
+
+    Retorna
+    -------
+    str
+        O identificador do novo snapshot.
+    """
+    import json
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime
+
+    source = os.path.abspath(source)
+    os.makedirs(os.path.join(store, 'snapshots'), exist_ok=True)
+
+    with _StoreLock(store, exclusive=False):
+        previous = dict()
+        for snapshot in reversed(list_backups(store)):
+            manifest = _read_manifest(store, snapshot['id'])
+            if (manifest['source'] == source
+                    and manifest['chunk_size'] == chunk_size
+                    and manifest['sha'] == sha):
+                previous = manifest['files']
+                break
+
+        links = dict()
+        if os.path.isdir(source):
+            files = dict()
+            directories = ['']
+            pending = ['']
+            while pending:
+                relative = pending.pop()
+                with os.scandir(os.path.join(source, relative)) as entries:
+                    for entry in entries:
+                        name = (f'{relative}/{entry.name}'
+                                if relative else entry.name)
+                        if entry.is_symlink():
+                            links[name] = os.readlink(entry.path)
+                        elif entry.is_dir():
+                            directories.append(name)
+                            pending.append(name)
+                        elif entry.is_file():
+                            files[name] = entry.path
+        else:
+            files = {os.path.basename(source): source}
+            directories = []
+
+        def record(item):
+            name, path = item
+            stat = os.stat(path)
+            entry = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'mode': stat.st_mode & 0o7777
+            }
+            old = previous.get(name)
+            if old is not None and (old['size'], old['mtime_ns']) == (
+                    stat.st_size, stat.st_mtime_ns):
+                entry['chunks'] = old['chunks']
+            else:
+                entry['chunks'] = _store_chunks(path, store, chunk_size, sha)
+            return name, entry
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            manifest_files = dict(executor.map(record, files.items()))
+
+        now = datetime.now()
+        snapshot = now.strftime('%Y-%m-%d_%H-%M-%S-%f')
+        manifest = {
+            'source': source,
+            'created': now.isoformat(),
+            'chunk_size': chunk_size,
+            'sha': sha,
+            'directories': sorted(directories),
+            'files': manifest_files,
+            'links': links
+        }
+        path = os.path.join(store, 'snapshots', f'{snapshot}.json')
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(f'{path}.tmp', path)
+
+        return snapshot
+
+
+def list_backups(store: str) -> list:
+    """
+    English:
+    ----------
+    Lists the snapshots of a backup store created by incremental_backup, from the oldest to the newest.
+
+    Parameters
+    ----------
+    store : str
+        The directory of the backup store.
+
+    Returns
+    -------
+    list
+        A list of dictionaries with the identifier ('id'), source ('source'), creation date ('created'), number of files ('files') and total size in bytes ('bytes') of each snapshot.
+
+    Português (brasileiro):
+    ----------
+    Lista os snapshots de um repositório de cópias criado por incremental_backup, do mais antigo ao mais recente.
+
+    Parâmetros
+    ----------
+    store : str
+        O diretório do repositório de cópias.
+
+    Retorna
+    -------
+    list
+        Uma lista de dicionários com o identificador ('id'), a origem ('source'), a data de criação ('created'), o número de arquivos ('files') e o tamanho total em bytes ('bytes') de cada snapshot.
+    """
+    import os
+
+    try:
+        names = sorted(
+            name[:-5] for name in os.listdir(os.path.join(store, 'snapshots'))
+            if name.endswith('.json'))
+    except FileNotFoundError:
+        return []
+
+    snapshots = []
+    for name in names:
+        manifest = _read_manifest(store, name)
+        snapshots.append({
+            'id': name,
+            'source': manifest['source'],
+            'created': manifest['created'],
+            'files': len(manifest['files']),
+            'bytes': sum(f['size'] for f in manifest['files'].values())
+        })
+    return snapshots
+
+
+def restore_backup(store: str,
+                   snapshot: str,
+                   destination: str,
+                   verify: bool = True):
+    """
+    English:
+    ----------
+    Restores a snapshot of a backup store created by incremental_backup.
+
+    Parameters
+    ----------
+    store : str
+        The directory of the backup store.
+    snapshot : str
+        The identifier of the snapshot (see list_backups).
+    destination : str
+        The directory where the files will be restored.
+    verify : bool, optional
+        If True, checks the hash of each chunk before writing it. The default is True.
+
+    Returns
+    -------
+    None
+
+    Português (brasileiro):
+    ----------
+    Restaura um snapshot de um repositório de cópias criado por incremental_backup.
+
+    Parâmetros
+    ----------
+    store : str
+        O diretório do repositório de cópias.
+    snapshot : str
+        O identificador do snapshot (ver list_backups).
+    destination : str
+        O diretório onde os arquivos serão restaurados.
+    verify : bool, opcional
+        Se True, verifica o hash de cada bloco antes de escrevê-lo. O padrão é True.
+
+    Retorna
+    -------
+    None
+    """
+    import os
+
+    with _StoreLock(store, exclusive=False):
+        manifest = _read_manifest(store, snapshot)
+        os.makedirs(destination, exist_ok=True)
+        for directory in manifest['directories']:
+            os.makedirs(os.path.join(destination, directory), exist_ok=True)
+
+        for name, entry in manifest['files'].items():
+            path = os.path.join(destination, name)
+            with open(path, 'wb') as output:
+                for digest in entry['chunks']:
+                    with open(os.path.join(store, 'chunks', digest[:2],
+                                           digest), 'rb') as chunk:
+                        data = chunk.read()
+                    if verify:
+                        hasher = _new_hasher(manifest['sha'])
+                        hasher.update(data)
+                        if hasher.hexdigest() != digest:
+                            raise ValueError(
+                                f'Bloco corrompido no repositório: {digest}')
+                    output.write(data)
+            os.chmod(path, entry['mode'])
+            os.utime(path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+
+        for name, target in manifest.get('links', {}).items():
+            path = os.path.join(destination, name)
+            if os.path.lexists(path):
+                os.remove(path)
+            os.symlink(target, path)
+
+
+def gc_backups(store: str, keep: int = 0) -> dict:
+    """
+    English:
+    ----------
+    Removes the chunks of a backup store that are no longer referenced by any snapshot. Optionally removes old snapshots first. It waits for the incremental_backup and restore_backup calls running on the same store to finish, and they wait for it.
+
+    Parameters
+    ----------
+    store : str
+        The directory of the backup store.
+    keep : int, optional
+        If greater than zero, only the `keep` newest snapshots are kept. The default is 0 (keeps every snapshot).
+
+    Returns
+    -------
+    dict
+        The number of removed snapshots ('snapshots') and chunks ('chunks'), and the freed bytes ('bytes').
+
+    Português (brasileiro):
+    ----------
+    Remove os blocos de um repositório de cópias que não são mais referenciados por nenhum snapshot. Opcionalmente remove snapshots antigos antes. Aguarda o fim das chamadas de incremental_backup e restore_backup em andamento no mesmo repositório, e elas aguardam por ela.
+
+    Parâmetros
+    ----------
+    store : str
+        O diretório do repositório de cópias.
+    keep : int, opcional
+        Se maior que zero, apenas os `keep` snapshots mais recentes são mantidos. O padrão é 0 (mantém todos os snapshots).
+
+    Retorna
+    -------
+    dict
+        O número de snapshots ('snapshots') e blocos ('chunks') removidos, e os bytes liberados ('bytes').
+    """
+    import os
+
+    if not os.path.isdir(store):
+        return {'snapshots': 0, 'chunks': 0, 'bytes': 0}
+    with _StoreLock(store, exclusive=True):
+        snapshots = [snapshot['id'] for snapshot in list_backups(store)]
+        removed = snapshots[:-keep] if keep > 0 else []
+        for snapshot in removed:
+            os.remove(os.path.join(store, 'snapshots', f'{snapshot}.json'))
+
+        referenced = set()
+        for snapshot in snapshots[len(removed):]:
+            for entry in _read_manifest(store, snapshot)['files'].values():
+                referenced.update(entry['chunks'])
+
+        chunks = 0
+        freed = 0
+        chunks_dir = os.path.join(store, 'chunks')
+        if os.path.isdir(chunks_dir):
+            for prefix in os.scandir(chunks_dir):
+                for chunk in os.scandir(prefix.path):
+                    if chunk.name not in referenced:
+                        freed += chunk.stat().st_size
+                        os.remove(chunk.path)
+                        chunks += 1
+
+        return {'snapshots': len(removed), 'chunks': chunks, 'bytes': freed}
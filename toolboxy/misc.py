@@ -1,3 +1,29 @@
+import sys as _sys
+
+# Shortest sleep that is honored with reasonable accuracy: the Windows timer
+# ticks every ~15.6 ms, other systems wake up within a couple of milliseconds.
+_SLEEP_RESOLUTION = 0.016 if _sys.platform == 'win32' else 0.002
+
+
+def _typing_schedule(string: str, wpm: float, letter_time: float = 0):
+    """Splits a string into (piece, deadline) pairs for typing it at `wpm`,
+    where deadline is the time in seconds, counted from the start, at which
+    the next piece may be written. Characters are grouped so that no wait is
+    shorter than the sleep resolution. A fixed `letter_time` overrides the
+    one derived from the word count of the string."""
+    import math
+
+    if not letter_time and string and wpm > 0:
+        letter_time = len(string.split()) / wpm * 60 / len(string)
+    if not string or letter_time <= 0:
+        yield string, 0.0
+        return
+    batch = max(1, math.ceil(_SLEEP_RESOLUTION / letter_time))
+    for start in range(0, len(string), batch):
+        end = min(start + batch, len(string))
+        yield string[start:end], end * letter_time
+
+
 def delay_print(string: str, wpm=180) -> None:
     """
     English
@@ -33,17 +59,129 @@ def delay_print(string: str, wpm=180) -> None:
     import sys
     import time
 
-    words_count = len(string.split())
-    total_time = (words_count / wpm) * 60
-    letter_time = total_time / len(string)
-    for letter in string:
-        sys.stdout.write(letter)
+    # Waits until absolute deadlines, so sleep overshoot does not accumulate.
+    start = time.monotonic()
+    for piece, deadline in _typing_schedule(string, wpm):
+        sys.stdout.write(piece)
         sys.stdout.flush()
-        time.sleep(letter_time)
+        remaining = start + deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
 
     print('')
 
 
+async def adelay_print(text, wpm=180, stream=None, end: str = '\n') -> None:
+    """
+    English
+    --------
+    Prints text with a delay, like delay_print, but awaiting instead of sleeping, so many outputs can be shown at the same time on one event loop. The text can also be an iterable or async iterable of chunks (e.g. tokens of a chat response), which are shown as they arrive.
+
+    Parameters
+    ----------
+    text : str, iterable or async iterable
+        The string to be printed, or the chunks of text to be printed as they arrive. Sync iterables must not block (e.g. lists).
+    wpm : int, optional
+        The word per minute speed. For chunks, a word is counted as 5 characters, since the whole text is not known in advance. The default is 180.
+    stream : file-like object, optional
+        Where the text is written: any object with a write method, sync or async (e.g. asyncio.StreamWriter, which is drained after each write). The default is None (sys.stdout).
+    end : str, optional
+        Written after the text. The default is a line break.
+    
+    Returns
+    -------
+    None.
+
+    Português (brasileiro)
+    -------
+    Imprime um texto com um delay, como delay_print, mas aguardando de forma assíncrona em vez de dormir, de modo que várias saídas podem ser exibidas ao mesmo tempo em um único loop de eventos. O texto também pode ser um iterável ou iterável assíncrono de partes (por exemplo, tokens da resposta de um chat), exibidas conforme chegam.
+
+    Parâmetros
+    ----------
+    text : str, iterable ou async iterable
+        A string a ser impressa, ou as partes do texto a serem impressas conforme chegam. Iteráveis síncronos não devem bloquear (por exemplo, listas).
+    wpm : int, optional
+        A velocidade de impressão em palavras por minuto. Para partes, uma palavra é contada como 5 caracteres, já que o texto completo não é conhecido antecipadamente. O padrão é 180.
+    stream : objeto do tipo arquivo, optional
+        Onde o texto é escrito: qualquer objeto com um método write, síncrono ou assíncrono (por exemplo, asyncio.StreamWriter, que é esvaziado após cada escrita). O padrão é None (sys.stdout).
+    end : str, optional
+        Escrito após o texto. O padrão é uma quebra de linha.
+    
+    Retorna
+    -------
+    None.
+    """
+    import asyncio
+    import inspect
+    import sys
+
+    stream = stream if stream is not None else sys.stdout
+    loop = asyncio.get_running_loop()
+    flush = getattr(stream, 'drain', None) or getattr(stream, 'flush', None)
+
+    async def write(piece):
+        result = stream.write(piece)
+        if inspect.isawaitable(result):
+            await result
+        if flush is not None:
+            result = flush()
+            if inspect.isawaitable(result):
+                await result
+
+    async def type_text(string, start, letter_time=0):
+        deadline = 0.0
+        for piece, deadline in _typing_schedule(string, wpm, letter_time):
+            await write(piece)
+            # sleep(0) still yields, so other outputs progress in between.
+            await asyncio.sleep(max(0, start + deadline - loop.time()))
+        return start + deadline
+
+    if isinstance(text, str):
+        await type_text(text, loop.time())
+    else:
+        letter_time = 12 / wpm if wpm > 0 else 0
+        ready = loop.time()
+        if hasattr(text, '__aiter__'):
+            async for chunk in text:
+                ready = await type_text(chunk, max(ready, loop.time()),
+                                        letter_time)
+        else:
+            for chunk in text:
+                ready = await type_text(chunk, max(ready, loop.time()),
+                                        letter_time)
+    if end:
+        await write(end)
+
+
+def _docstring_prompt(code: str) -> str:
+    """Builds the completion prompt asking for a docstring in the style of
+    the repository for the given source code."""
+    return f"""
+Crie docstrings em inglês e português semelhante ao exemplo abaixo, para a função informada. Seja sucinto.
+
+\"""
+English:
+----------
+Runs the 'pipreqs' command to generate a 'requirements.txt' file with dependencies.
+
+Returns
+-------
+None
+
+Português (brasileiro):
+----------
+Executa o comando 'pipreqs' para gerar um arquivo 'requirements.txt' com as dependências.
+
+Retorna
+-------
+None
+\"""
+
+Função:
+{code}
+    """
+
+
 def gpt_docstring(func,
                   api_key: str = "",
                   max_tokens: int = 500,
@@ -101,30 +239,7 @@ def gpt_docstring(func,
         api_key = os.environ.get('OPENAI_API_KEY')
 
     code = inspect.getsource(func)
-    prompt = f"""
-Crie docstrings em inglês e português semelhante ao exemplo abaixo, para a função informada. Seja sucinto.
-
-\"""
-English:
-----------
-Runs the 'pipreqs' command to generate a 'requirements.txt' file with dependencies.
-
-Returns
--------
-None
-
-Português (brasileiro):
-----------
-Executa o comando 'pipreqs' para gerar um arquivo 'requirements.txt' com as dependências.
-
-Retorna
--------
-None
-\"""
-
-Função:
-{code}
-    """
+    prompt = _docstring_prompt(code)
     openai.api_key = api_key
     response = openai.Completion.create(
         model='text-davinci-003',
@@ -144,6 +259,274 @@ Função:
     return docstring
 
 
+def _collect_functions(target, include_private: bool,
+                       skip_documented: bool) -> list:
+    """Returns (qualname, source) pairs of the functions and methods defined
+    in a module, package or path, read with ast without importing them."""
+    import ast
+    import inspect
+    import os
+
+    if isinstance(target, str):
+        path = os.path.abspath(target)
+        name = os.path.splitext(os.path.basename(path.rstrip(os.sep)))[0]
+    else:
+        name = target.__name__
+        paths = getattr(target, '__path__', None)
+        path = list(paths)[0] if paths else inspect.getsourcefile(target)
+
+    files = []
+    if os.path.isdir(path):
+        for root, dirs, filenames in os.walk(path):
+            dirs[:] = sorted(
+                d for d in dirs if not d.startswith(('.', '__')) and
+                (include_private or not d.startswith('_')))
+            for filename in sorted(filenames):
+                if filename.endswith('.py') and (
+                        include_private or filename == '__init__.py' or
+                        not filename.startswith('_')):
+                    relative = os.path.relpath(os.path.join(root, filename),
+                                               path)[:-3].split(os.sep)
+                    if relative[-1] == '__init__':
+                        relative.pop()
+                    files.append((os.path.join(root, filename),
+                                  '.'.join([name] + relative)))
+    else:
+        files.append((path, name))
+
+    functions = []
+    for file, module in files:
+        with open(file, encoding='utf-8') as f:
+            source = f.read()
+        nodes = [(node, module) for node in ast.parse(source).body]
+        while nodes:
+            node, prefix = nodes.pop(0)
+            if isinstance(node, ast.ClassDef):
+                nodes.extend((child, f'{prefix}.{node.name}')
+                             for child in node.body)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                if node.name.startswith('_') and not include_private:
+                    continue
+                if skip_documented and ast.get_docstring(node):
+                    continue
+                functions.append((f'{prefix}.{node.name}',
+                                  ast.get_source_segment(source, node)))
+    return functions
+
+
+class _RateLimiter:
+    """Token buckets for requests and tokens per minute. Each bucket holds
+    at most one second of its rate, so requests are spread evenly instead of
+    being sent in bursts."""
+
+    def __init__(self, rpm: float, tpm: float):
+        import threading
+        import time
+
+        self.rates = (rpm / 60, tpm / 60)
+        self.capacity = tuple(max(1.0, rate) for rate in self.rates)
+        self.levels = list(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        import time
+
+        now = time.monotonic()
+        for n, rate in enumerate(self.rates):
+            self.levels[n] = min(self.capacity[n],
+                                 self.levels[n] + (now - self.updated) * rate)
+        self.updated = now
+
+    def acquire(self, tokens: float) -> float:
+        """Blocks until one request of `tokens` tokens is allowed and returns
+        the tokens charged, which are capped at the bucket capacity."""
+        import time
+
+        needs = (1.0, min(tokens, self.capacity[1]))
+        while True:
+            with self.lock:
+                self._refill()
+                if all(level >= need
+                       for level, need in zip(self.levels, needs)):
+                    for n, need in enumerate(needs):
+                        self.levels[n] -= need
+                    return needs[1]
+                wait = max((need - level) / rate for level, need, rate in
+                           zip(self.levels, needs, self.rates))
+            time.sleep(wait)
+
+    def adjust(self, tokens: float):
+        """Charges (or refunds) the difference between the tokens actually
+        used and the ones charged in acquire."""
+        with self.lock:
+            self._refill()
+            self.levels[1] = min(self.capacity[1], self.levels[1] - tokens)
+
+
+def _complete(session, prompt: str, model: str, max_tokens: int,
+              api_base: str, api_key: str, limiter: _RateLimiter,
+              max_retries: int) -> str:
+    """Sends one request to the completions endpoint, retrying rate limits,
+    server errors and connection errors with exponential backoff."""
+    import random
+    import time
+
+    import requests as re
+
+    estimate = len(prompt) / 4 + max_tokens
+    for attempt in range(max_retries + 1):
+        charged = limiter.acquire(estimate)
+        delay = None
+        try:
+            response = session.post(f'{api_base.rstrip("/")}/completions',
+                                    headers={'Authorization': f'Bearer {api_key}'},
+                                    json={
+                                        'model': model,
+                                        'prompt': prompt,
+                                        'max_tokens': max_tokens,
+                                        'temperature': 0.1
+                                    },
+                                    timeout=120)
+        except (re.ConnectionError, re.Timeout):
+            if attempt == max_retries:
+                raise
+        else:
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == max_retries:
+                    response.raise_for_status()
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.replace('.', '', 1).isdigit():
+                    delay = float(retry_after)
+            else:
+                response.raise_for_status()
+                body = response.json()
+                used = body.get('usage', {}).get('total_tokens')
+                if used is not None:
+                    limiter.adjust(used - charged)
+                return body['choices'][0]['text']
+        if delay is None:
+            delay = min(60, 2**attempt) * random.uniform(0.5, 1)
+        time.sleep(delay)
+
+
+def gpt_docstrings(target,
+                   api_key: str = "",
+                   max_tokens: int = 500,
+                   model: str = 'text-davinci-003',
+                   api_base: str = 'https://api.openai.com/v1',
+                   rpm: int = 60,
+                   tpm: int = 150000,
+                   workers: int = 8,
+                   max_retries: int = 5,
+                   include_private: bool = False,
+                   skip_documented: bool = True) -> dict:
+    """
+    English:
+    ----------
+    Generates docstrings, like gpt_docstring, for all the functions and methods of a module or package, sending the requests concurrently while respecting the requests-per-minute and tokens-per-minute limits of the API. Rate limits and server errors are retried with exponential backoff. Nothing is copied to the clipboard.
+
+    Parameters
+    ----------
+    target: module or str
+        Module, package or path (file or directory) whose functions are documented. The source is read with ast, without importing it.
+    api_key: str, optional
+        OpenAI API key. The default is an empty string (read from OPENAI_API_KEY or a .env file).
+    max_tokens: int, optional
+        Maximum number of tokens to generate for each docstring. The default is 500.
+    model: str, optional
+        Completion model. The default is 'text-davinci-003'.
+    api_base: str, optional
+        Base URL of the API (e.g. a compatible server or a proxy). The default is 'https://api.openai.com/v1'.
+    rpm: int, optional
+        Maximum requests per minute. The default is 60.
+    tpm: int, optional
+        Maximum tokens per minute (estimated from the prompt size and max_tokens, then corrected with the usage reported by the API). The default is 150000.
+    workers: int, optional
+        Maximum number of simultaneous requests. The default is 8.
+    max_retries: int, optional
+        Number of retries of each request. The default is 5.
+    include_private: bool, optional
+        If True, also documents functions whose names start with an underscore, and the modules and subpackages whose names start with one. The default is False.
+    skip_documented: bool, optional
+        If True, skips functions that already have a docstring. The default is True.
+
+    Returns
+    -------
+    dict
+        The generated docstrings by qualified name (e.g. 'package.module.Class.method'). Functions whose requests failed are logged and left out.
+
+    Português (brasileiro):
+    ----------
+    Gera docstrings, como gpt_docstring, para todas as funções e métodos de um módulo ou pacote, enviando as requisições de forma concorrente e respeitando os limites de requisições por minuto e de tokens por minuto da API. Limites de taxa e erros do servidor são repetidos com espera exponencial. Nada é copiado para a área de transferência.
+
+    Parâmetros
+    ----------
+    target: module ou str
+        Módulo, pacote ou caminho (arquivo ou diretório) cujas funções serão documentadas. O código é lido com ast, sem importá-lo.
+    api_key: str, opcional
+        Chave da API do OpenAI. O padrão é uma string vazia (lida de OPENAI_API_KEY ou de um arquivo .env).
+    max_tokens: int, opcional
+        Número máximo de tokens para gerar em cada docstring. O padrão é 500.
+    model: str, opcional
+        Modelo de completude. O padrão é 'text-davinci-003'.
+    api_base: str, opcional
+        URL base da API (por exemplo, um servidor compatível ou um proxy). O padrão é 'https://api.openai.com/v1'.
+    rpm: int, opcional
+        Máximo de requisições por minuto. O padrão é 60.
+    tpm: int, opcional
+        Máximo de tokens por minuto (estimado pelo tamanho do prompt e por max_tokens, e depois corrigido pelo uso informado pela API). O padrão é 150000.
+    workers: int, opcional
+        Número máximo de requisições simultâneas. O padrão é 8.
+    max_retries: int, opcional
+        Número de novas tentativas de cada requisição. O padrão é 5.
+    include_private: bool, opcional
+        Se True, também documenta funções, módulos e subpacotes cujos nomes começam com sublinhado. O padrão é False.
+    skip_documented: bool, opcional
+        Se True, ignora funções que já possuem docstring. O padrão é True.
+
+    Retorna
+    -------
+    dict
+        As docstrings geradas por nome qualificado (por exemplo, 'pacote.modulo.Classe.metodo'). Funções cujas requisições falharam são registradas no log e deixadas de fora.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests as re
+    from loguru import logger as log
+
+    if api_key == "":
+        from dotenv import load_dotenv
+        import os
+
+        load_dotenv()
+        api_key = os.environ.get('OPENAI_API_KEY')
+
+    functions = _collect_functions(target, include_private, skip_documented)
+    limiter = _RateLimiter(rpm, tpm)
+    session = re.Session()
+    adapter = re.adapters.HTTPAdapter(pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    def document(item):
+        qualname, code = item
+        try:
+            return qualname, _complete(session, _docstring_prompt(code), model,
+                                       max_tokens, api_base, api_key, limiter,
+                                       max_retries)
+        except Exception as e:
+            log.error(f'{qualname}: {e!r}')
+            return qualname, None
+
+    with session, ThreadPoolExecutor(workers) as executor:
+        results = executor.map(document, functions)
+        return {
+            qualname: docstring
+            for qualname, docstring in results if docstring is not None
+        }
+
+
 def unique_id(length: int,
               letters: bool = True,
               numbers: bool = True,
@@ -39,16 +39,521 @@ def chrome2dict(headers_path: str = "", headers_str: str = ""):
 
     elif headers_path != "":
         with open(headers_path, 'r') as raw_headers:
-            return dict([[
-                h.strip('\n').partition(': ')[0],
-                h.strip('\n').partition(': ')[2]
-            ] for h in raw_headers.readlines()])
+            return _parse_header_lines(raw_headers)
 
     else:
-        return dict([[
-            h.partition(': ')[0],
-            h.partition(': ')[2]
-        ] for h in headers_str.split('\n')])
+        return _parse_header_lines(headers_str.split('\n'))
+
+
+def _parse_header_lines(lines) -> dict:
+    """Builds a headers dictionary from 'name: value' lines in a single pass
+    over each line."""
+    headers = dict()
+    for line in lines:
+        name, _, value = line.rstrip('\n').partition(': ')
+        headers[name] = value
+    return headers
+
+
+def _har_entries(file, chunk_size: int):
+    """Yields the entries of a HAR file one by one, decoding each object of
+    the log.entries array separately instead of loading the whole file."""
+    import json
+    import re
+
+    decoder = json.JSONDecoder()
+    start = re.compile(r'(?<!\\)"entries"\s*:\s*\[')
+    buffer = ''
+    while True:
+        match = start.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        buffer = buffer[-64:] + chunk
+
+    whitespace = re.compile(r'[\s,]*')
+    position = 0
+    needed = 0
+    eof = False
+    while True:
+        position = whitespace.match(buffer, position).end()
+        if buffer.startswith(']', position):
+            return
+        if len(buffer) - position >= max(needed, 1):
+            try:
+                entry, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Grows the buffer geometrically before retrying, so entries
+                # much larger than chunk_size are not decoded over and over.
+                needed = 2 * (len(buffer) - position)
+            else:
+                needed = 0
+                yield entry
+                continue
+        elif eof:
+            return
+        chunk = file.read(max(chunk_size, needed - len(buffer) + position))
+        if chunk:
+            buffer = buffer[position:] + chunk
+            position = 0
+        else:
+            eof = True
+            needed = 0
+
+
+def har2dict(har_path: str,
+             url_pattern: str = '',
+             with_url: bool = False,
+             chunk_size: int = 1048576):
+    """
+    English:
+    ----------
+    This function reads the requests saved in a HAR file (exported from the Chrome DevTools) and yields their headers as dictionaries, in the same format returned by chrome2dict. The file is read incrementally, one entry at a time, so HAR files of hundreds of megabytes can be processed with little memory.
+
+    Parameters
+    ----------
+    har_path : str
+        The path to the HAR file.
+    url_pattern : str, optional
+        Regular expression searched in the URL of each request; requests that do not match are skipped. The default is an empty string (all requests).
+    with_url : bool, optional
+        If True, yields (url, headers) tuples instead of only the headers. The default is False.
+    chunk_size : int, optional
+        Number of characters read from the file at a time. The default is 1048576 (1 MiB).
+
+    Yields
+    -------
+    dict or tuple
+        The dictionary containing the headers of each request, or the (url, headers) tuple if `with_url` is True.
+
+    Português (brasileiro):
+    ----------
+    Esta função lê as solicitações salvas em um arquivo HAR (exportado pelo DevTools do Chrome) e gera seus cabeçalhos como dicionários, no mesmo formato retornado por chrome2dict. O arquivo é lido de forma incremental, uma entrada por vez, de modo que arquivos HAR de centenas de megabytes podem ser processados com pouca memória.
+
+    Parâmetros
+    ----------
+    har_path : str
+        O caminho para o arquivo HAR.
+    url_pattern : str, opcional
+        Expressão regular buscada na URL de cada solicitação; solicitações que não correspondem são ignoradas. O padrão é uma string vazia (todas as solicitações).
+    with_url : bool, opcional
+        Se True, gera tuplas (url, cabeçalhos) em vez de apenas os cabeçalhos. O padrão é False.
+    chunk_size : int, opcional
+        Número de caracteres lidos do arquivo por vez. O padrão é 1048576 (1 MiB).
+
+    Gera
+    -------
+    dict ou tuple
+        O dicionário contendo os cabeçalhos de cada solicitação, ou a tupla (url, cabeçalhos) se `with_url` for True.
+    """
+    import re
+
+    pattern = re.compile(url_pattern) if url_pattern else None
+    with open(har_path, 'r', encoding='utf-8-sig') as file:
+        for entry in _har_entries(file, chunk_size):
+            request = entry.get('request', {})
+            url = request.get('url', '')
+            if pattern is not None and not pattern.search(url):
+                continue
+            headers = {
+                header['name']: header['value']
+                for header in request.get('headers', [])
+            }
+            yield (url, headers) if with_url else headers
+
+
+_SKIPPED_TAGS = ('script', 'style', 'noscript', 'template')
+_BLOCK_TAGS = ('address', 'article', 'aside', 'blockquote', 'body', 'br',
+               'caption', 'dd', 'details', 'div', 'dl', 'dt', 'fieldset',
+               'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3',
+               'h4', 'h5', 'h6', 'head', 'header', 'hr', 'html', 'li', 'main',
+               'nav', 'ol', 'option', 'p', 'pre', 'section', 'summary',
+               'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'title', 'tr',
+               'ul')
+
+
+def _collapse_text(text: str) -> str:
+    """Collapses whitespace inside each block (blocks are separated by
+    U+2029) and returns the non-empty blocks one per line."""
+    lines = (' '.join(block.split()) for block in text.split('\u2029'))
+    return '\n'.join(line for line in lines if line) + '\n'
+
+
+def _convert_html(html: str,
+                  output_path: str,
+                  mode: str = 'html',
+                  parser: str = 'bs4'):
+    """Writes the prettified HTML (mode='html') or the readable text
+    (mode='text') of a page to `output_path`, using the chosen parser."""
+    if mode not in ('html', 'text'):
+        raise ValueError("Modo inválido. Opções: 'html' ou 'text'")
+
+    if parser == 'bs4':
+        from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+        soup = BeautifulSoup(html, features='lxml')
+        if mode == 'html':
+            result = soup.prettify()
+        else:
+            # Iterative walk: None marks the end of a block element.
+            pieces = []
+            stack = [soup]
+            while stack:
+                node = stack.pop()
+                if node is None:
+                    pieces.append('\u2029')
+                elif isinstance(node, Tag):
+                    if node.name in _SKIPPED_TAGS:
+                        continue
+                    if node.name in _BLOCK_TAGS:
+                        pieces.append('\u2029')
+                        stack.append(None)
+                    stack.extend(reversed(node.contents))
+                elif type(node) in (NavigableString, CData):
+                    pieces.append(node)
+            result = _collapse_text(''.join(pieces))
+
+    elif parser == 'lxml':
+        import lxml.etree
+        import lxml.html
+
+        try:
+            document = lxml.html.document_fromstring(html)
+        except lxml.etree.ParserError:
+            result = ''
+        else:
+            if mode == 'html':
+                result = lxml.html.tostring(document,
+                                            pretty_print=True,
+                                            encoding='unicode')
+            else:
+                for element in list(document.iter(*_SKIPPED_TAGS)):
+                    element.drop_tree()
+                for element in document.iter(*_BLOCK_TAGS):
+                    element.text = '\u2029' + (element.text or '')
+                    element.tail = '\u2029' + (element.tail or '')
+                result = _collapse_text(document.text_content())
+
+    elif parser == 'html.parser':
+        from io import StringIO
+
+        output = StringIO()
+        converter = (_streaming_prettifier(output)
+                     if mode == 'html' else _text_extractor(output))
+        converter.feed(html)
+        converter.close()
+        result = output.getvalue()
+
+    else:
+        raise ValueError(
+            "Parser inválido. Opções: 'bs4', 'lxml' ou 'html.parser'")
+
+    with open(output_path, 'w', encoding='utf-8') as output:
+        output.write(result)
+
+
+def _streaming_prettifier(output):
+    """Returns an incremental HTML parser that writes each tag and text node
+    to `output` on its own indented line (the layout of BeautifulSoup's
+    prettify) as soon as it is fed, keeping only the open tag stack."""
+    from html import escape
+    from html.parser import HTMLParser
+
+    void = {
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+        'meta', 'param', 'source', 'track', 'wbr'
+    }
+
+    class Prettifier(HTMLParser):
+
+        def __init__(self):
+            super().__init__(convert_charrefs=True)
+            self.stack = []
+
+        def _line(self, text: str):
+            output.write(' ' * len(self.stack) + text + '\n')
+
+        def handle_starttag(self, tag, attrs):
+            attributes = ''.join(
+                f' {name}' if value is None else
+                f' {name}="{escape(value, quote=True)}"'
+                for name, value in attrs)
+            if tag in void:
+                self._line(f'<{tag}{attributes}/>')
+            else:
+                self._line(f'<{tag}{attributes}>')
+                self.stack.append(tag)
+
+        def handle_startendtag(self, tag, attrs):
+            self.handle_starttag(tag, attrs)
+            if tag not in void:
+                self.handle_endtag(tag)
+
+        def handle_endtag(self, tag):
+            if tag in self.stack:
+                while self.stack:
+                    opened = self.stack.pop()
+                    self._line(f'</{opened}>')
+                    if opened == tag:
+                        break
+
+        def handle_data(self, data):
+            data = data.strip()
+            if data:
+                if self.stack and self.stack[-1] in ('script', 'style'):
+                    self._line(data)
+                else:
+                    self._line(escape(data, quote=False))
+
+        def handle_comment(self, data):
+            self._line(f'<!--{data}-->')
+
+        def handle_decl(self, decl):
+            self._line(f'<!{decl}>')
+
+        def close(self):
+            super().close()
+            while self.stack:
+                self._line(f'</{self.stack.pop()}>')
+
+    return Prettifier()
+
+
+def _text_extractor(output):
+    """Returns an incremental HTML parser that writes the readable text of the
+    page to `output`, one block (paragraph, heading, list item...) per line,
+    dropping script and style content and collapsing whitespace."""
+    from html.parser import HTMLParser
+
+    class TextExtractor(HTMLParser):
+
+        def __init__(self):
+            super().__init__(convert_charrefs=True)
+            self.skipping = 0
+            self.line = []
+
+        def _break(self):
+            text = ' '.join(''.join(self.line).split())
+            if text:
+                output.write(text + '\n')
+            self.line = []
+
+        def handle_starttag(self, tag, attrs):
+            if tag in _SKIPPED_TAGS:
+                self.skipping += 1
+            elif tag in _BLOCK_TAGS:
+                self._break()
+
+        def handle_endtag(self, tag):
+            if tag in _SKIPPED_TAGS:
+                self.skipping = max(self.skipping - 1, 0)
+            elif tag in _BLOCK_TAGS:
+                self._break()
+
+        def handle_data(self, data):
+            if not self.skipping:
+                self.line.append(data)
+
+        def close(self):
+            super().close()
+            self._break()
+
+    return TextExtractor()
+
+
+def _stream_html(response,
+                 output_path: str,
+                 chunk_size: int = 65536,
+                 mode: str = 'html'):
+    """Converts a response read in chunks, writing the output as it goes, so
+    memory use depends on `chunk_size` and not on the page size."""
+    import codecs
+
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(
+        errors='replace')
+    with open(output_path, 'w', encoding='utf-8') as output:
+        parser = (_streaming_prettifier(output)
+                  if mode == 'html' else _text_extractor(output))
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+
+
+class _HttpCache:
+    """On-disk response cache: bodies are stored as files and their validators
+    (ETag/Last-Modified) in a SQLite index, evicted by least recent use. Each
+    write is committed at once, so runs sharing the directory see each other's
+    entries and a crash does not lose the index."""
+
+    def __init__(self, directory: str, max_bytes: int = 268435456):
+        import os
+        import sqlite3
+        import threading
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'bodies'), exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(directory, 'index.db'),
+                                          timeout=30,
+                                          check_same_thread=False)
+        self.connection.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,
+                encoding TEXT, size INTEGER, last_used REAL,
+                output_path TEXT, output_mtime_ns INTEGER, output_options TEXT);
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY, value INTEGER);
+            INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0);
+        ''')
+
+    def _body_path(self, url: str) -> str:
+        import hashlib
+        import os
+
+        return os.path.join(self.directory, 'bodies',
+                            hashlib.sha1(url.encode()).hexdigest())
+
+    def fetch(self, get, url: str, output_path: str, headers: dict,
+              params: dict, timeout, write_errors: bool, convert,
+              options: str) -> int:
+        import os
+        import time
+
+        import requests as re
+
+        key = re.Request('GET', url, params=params).prepare().url
+        body_path = self._body_path(key)
+        with self.lock:
+            row = self.connection.execute(
+                '''SELECT etag, last_modified, encoding, output_path,
+                          output_mtime_ns, output_options
+                   FROM responses WHERE url = ?''', (key, )).fetchone()
+
+        conditional = dict(headers)
+        if row is not None and os.path.exists(body_path):
+            if row[0]:
+                conditional['If-None-Match'] = row[0]
+            if row[1]:
+                conditional['If-Modified-Since'] = row[1]
+        else:
+            row = None
+
+        response = get(url,
+                       headers=conditional,
+                       params=params,
+                       timeout=timeout)
+
+        if response.status_code == 304 and row is not None:
+            output = os.path.abspath(output_path)
+            try:
+                current = (row[3], row[4], row[5]) == (
+                    output, os.stat(output).st_mtime_ns, options)
+            except FileNotFoundError:
+                current = False
+            if not current:
+                with open(body_path, 'rb') as body:
+                    html = body.read().decode(row[2] or 'utf-8', 'replace')
+                convert(html)
+            with self.lock:
+                self.hits += 1
+                self.connection.execute(
+                    '''UPDATE responses SET last_used = ?, output_path = ?,
+                          output_mtime_ns = ?, output_options = ?
+                       WHERE url = ?''',
+                    (time.time(), output, os.stat(output).st_mtime_ns,
+                     options, key))
+                self.connection.commit()
+            return 200
+
+        with self.lock:
+            self.misses += 1
+        if write_errors or response.status_code < 400:
+            convert(response.text)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if (response.status_code == 200 and (etag or last_modified) and
+                'no-store' not in response.headers.get('Cache-Control', '')):
+            with open(f'{body_path}.tmp', 'wb') as body:
+                body.write(response.content)
+            os.replace(f'{body_path}.tmp', body_path)
+            output = os.path.abspath(output_path)
+            with self.lock:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, etag, last_modified, response.encoding or
+                     response.apparent_encoding, len(response.content),
+                     time.time(), output, os.stat(output).st_mtime_ns,
+                     options))
+                self._evict()
+                self.connection.commit()
+        return response.status_code
+
+    def _evict(self):
+        import os
+
+        total = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.connection.execute(
+                'SELECT url, size FROM responses ORDER BY last_used').fetchall():
+            if total <= self.max_bytes:
+                break
+            self.connection.execute('DELETE FROM responses WHERE url = ?',
+                                    (url, ))
+            try:
+                os.remove(self._body_path(url))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def close(self):
+        with self.connection:
+            self.connection.execute(
+                'UPDATE stats SET value = value + ? WHERE name = ?',
+                (self.hits, 'hits'))
+            self.connection.execute(
+                'UPDATE stats SET value = value + ? WHERE name = ?',
+                (self.misses, 'misses'))
+        self.connection.close()
+
+
+def _fetch_html(get,
+                url: str,
+                output_path: str,
+                headers: dict,
+                params: dict,
+                timeout=None,
+                cache: _HttpCache = None,
+                write_errors: bool = True,
+                mode: str = 'html',
+                parser: str = 'bs4') -> int:
+    """Downloads a page and converts it, going through `cache` when given.
+    Returns the HTTP status code."""
+
+    def convert(html):
+        _convert_html(html, output_path, mode, parser)
+
+    if cache is not None:
+        return cache.fetch(get, url, output_path, headers, params, timeout,
+                           write_errors, convert, f'{mode}:{parser}')
+
+    response = get(url, headers=headers, params=params, timeout=timeout)
+    if write_errors or response.status_code < 400:
+        convert(response.text)
+    return response.status_code
 
 
 def html2txt(url: str = '',
@@ -56,7 +561,13 @@ def html2txt(url: str = '',
              output_path: str = 'output.txt',
              exit_flag: bool = False,
              headers: dict = {},
-             params: dict = {}):
+             params: dict = {},
+             cache_dir: str = '',
+             cache_size: int = 268435456,
+             stream: bool = False,
+             chunk_size: int = 65536,
+             mode: str = 'html',
+             parser: str = 'bs4'):
     """
     English:
     ----------
@@ -76,6 +587,18 @@ def html2txt(url: str = '',
         The header settings of the request. The default is an empty dictionary.
     params : dict
         The parameters of the request. The default is an empty dictionary.
+    cache_dir : str, optional
+        Directory of an on-disk response cache. Cached pages are requested with If-None-Match/If-Modified-Since, and on a 304 response the stored body is reused (and the conversion skipped if the output file is already up to date). The default is an empty string (no cache).
+    cache_size : int, optional
+        Maximum size in bytes of the stored bodies. The least recently used are removed first. The default is 256 MiB.
+    stream : bool, optional
+        If True, the page is downloaded in chunks and parsed incrementally, and the output is written as it is produced, so memory use is bounded by `chunk_size` instead of the page size. The layout follows BeautifulSoup's prettify, but the document is not repaired (missing <html>/<body> tags are not added). The response cache is not used in this mode. The default is False.
+    chunk_size : int, optional
+        Size in bytes of each chunk read in streaming mode. The default is 64 KiB.
+    mode : str, optional
+        'html' writes the prettified HTML. 'text' writes only the readable text, one block per line, without script and style content and with collapsed whitespace. The default is 'html'.
+    parser : str, optional
+        The parser used: 'bs4' (BeautifulSoup with lxml), 'lxml' (lxml.html directly, faster) or 'html.parser' (standard library). The streaming mode always uses 'html.parser'. The default is 'bs4'.
 
     Returns
     -------
@@ -99,23 +622,51 @@ def html2txt(url: str = '',
         As configurações de cabeçalho da requisição. O padrão é um dicionário vazio.
     params : dict
         Os parâmetros da requisição. O padrão é um dicionário vazio.
+    cache_dir : str, opcional
+        Diretório de um cache de respostas em disco. Páginas em cache são requisitadas com If-None-Match/If-Modified-Since e, em uma resposta 304, o conteúdo armazenado é reaproveitado (e a conversão é ignorada se o arquivo de saída já estiver atualizado). O padrão é uma string vazia (sem cache).
+    cache_size : int, opcional
+        Tamanho máximo em bytes dos conteúdos armazenados. Os usados há mais tempo são removidos primeiro. O padrão é 256 MiB.
+    stream : bool, opcional
+        Se True, a página é baixada em blocos e processada de forma incremental, e a saída é gravada à medida que é produzida, de modo que o uso de memória é limitado por `chunk_size` e não pelo tamanho da página. O formato segue o prettify do BeautifulSoup, mas o documento não é corrigido (tags <html>/<body> ausentes não são adicionadas). O cache de respostas não é usado nesse modo. O padrão é False.
+    chunk_size : int, opcional
+        Tamanho em bytes de cada bloco lido no modo streaming. O padrão é 64 KiB.
+    mode : str, opcional
+        'html' grava o HTML formatado. 'text' grava apenas o texto legível, um bloco por linha, sem o conteúdo de scripts e estilos e com espaços em branco agrupados. O padrão é 'html'.
+    parser : str, opcional
+        O parser utilizado: 'bs4' (BeautifulSoup com lxml), 'lxml' (lxml.html diretamente, mais rápido) ou 'html.parser' (biblioteca padrão). O modo streaming sempre usa 'html.parser'. O padrão é 'bs4'.
 
     Retorna
     -------
     None
     """
-    from bs4 import BeautifulSoup
-
     if url == '' and response == '':
         raise AttributeError(
             "Necessário informar a URL ou a resposta (requests)")
+    elif stream:
+        if url != '':
+            import requests as re
+
+            response = re.get(url, headers=headers, params=params, stream=True)
+        with response:
+            _stream_html(response, output_path, chunk_size, mode)
     elif url != '':
         import requests as re
 
-        response = re.get(url, headers=headers, params=params)
-
-    with open(output_path, 'w', encoding='utf-8') as output:
-        output.write(BeautifulSoup(response.text, features='lxml').prettify())
+        cache = _HttpCache(cache_dir, cache_size) if cache_dir else None
+        try:
+            _fetch_html(re.get,
+                        url,
+                        output_path,
+                        headers,
+                        params,
+                        cache=cache,
+                        mode=mode,
+                        parser=parser)
+        finally:
+            if cache is not None:
+                cache.close()
+    else:
+        _convert_html(response.text, output_path, mode, parser)
 
     if exit_flag == True:
         from sys import exit
@@ -123,7 +674,813 @@ def html2txt(url: str = '',
         exit()
 
 
-def verify_proxy(ip: str, port: str | int, timeout: int = 5, verbose: int = 1):
+def _pooled_session(size: int):
+    """Returns a requests Session that keeps up to `size` connections per
+    host alive, to be shared by `size` threads."""
+    import requests as re
+
+    session = re.Session()
+    adapter = re.adapters.HTTPAdapter(pool_connections=size,
+                                      pool_maxsize=size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _host_runners(urls: list, per_host: int, task) -> list:
+    """Groups the URL indices by host and returns jobs that each call
+    task(index) for the URLs of one host, one after another. At most
+    `per_host` jobs are made per host, so pool threads never sit waiting for
+    a busy host while URLs of other hosts are queued."""
+    from collections import deque
+    from urllib.parse import urlsplit
+
+    queues = dict()
+    for index, url in enumerate(urls):
+        queues.setdefault(urlsplit(url).netloc.lower(), deque()).append(index)
+
+    def runner(queue):
+
+        def run():
+            while True:
+                try:
+                    index = queue.popleft()
+                except IndexError:
+                    return
+                task(index)
+
+        return run
+
+    # Round-robin, so the first jobs to start cover every host.
+    return [
+        runner(queue) for slot in range(per_host)
+        for queue in queues.values() if len(queue) > slot
+    ]
+
+
+def _timed_convert(html: str, output_path: str, mode: str,
+                   parser: str) -> float:
+    """Converts a page (in a worker process) and returns the time spent."""
+    import time
+
+    start = time.perf_counter()
+    _convert_html(html, output_path, mode, parser)
+    return time.perf_counter() - start
+
+
+def html2txt_many(urls,
+                  output_paths=None,
+                  output_dir: str = '',
+                  max_workers: int = 16,
+                  per_host: int = 4,
+                  timeout: float = 30,
+                  headers: dict = {},
+                  params: dict = {},
+                  cache_dir: str = '',
+                  cache_size: int = 268435456,
+                  mode: str = 'html',
+                  parser: str = 'bs4') -> list:
+    """
+    English:
+    ----------
+    Converts the HTML content of many URLs into text files, fetching them concurrently. The number of simultaneous requests is limited in total and per host, and connections are reused between requests.
+
+    Parameters
+    ----------
+    urls : iterable
+        The URLs to be converted.
+    output_paths : iterable, optional
+        The output file of each URL, one per URL. If not provided, the files are named '<index>.txt' inside `output_dir`.
+    output_dir : str, optional
+        The directory of the output files when `output_paths` is not provided. The default is an empty string (current directory).
+    max_workers : int, optional
+        The maximum number of simultaneous requests. The default is 16.
+    per_host : int, optional
+        The maximum number of simultaneous requests to the same host. The default is 4.
+    timeout : float, optional
+        The maximum wait time of each request, in seconds. The default is 30.
+    headers : dict, optional
+        The header settings of the requests. The default is an empty dictionary.
+    params : dict, optional
+        The parameters of the requests. The default is an empty dictionary.
+    cache_dir : str, optional
+        Directory of an on-disk response cache (see html2txt). The default is an empty string (no cache).
+    cache_size : int, optional
+        Maximum size in bytes of the stored bodies. The default is 256 MiB.
+    mode : str, optional
+        'html' (prettified HTML) or 'text' (readable text only), as in html2txt. The default is 'html'.
+    parser : str, optional
+        'bs4', 'lxml' or 'html.parser', as in html2txt. The default is 'bs4'.
+
+    Returns
+    -------
+    list
+        One dictionary per URL, in the same order, with the keys 'url', 'output_path', 'status' (HTTP status code or None), 'elapsed' (seconds) and 'error' (None on success). Responses with status 400 or above are not written.
+
+    Português (brasileiro):
+    ----------
+    Converte o conteúdo HTML de várias URLs em arquivos de texto, buscando-as de forma concorrente. O número de requisições simultâneas é limitado no total e por host, e as conexões são reaproveitadas entre as requisições.
+
+    Parâmetros
+    ----------
+    urls : iterable
+        As URLs a serem convertidas.
+    output_paths : iterable, opcional
+        O arquivo de saída de cada URL, um por URL. Se não for informado, os arquivos são nomeados '<índice>.txt' dentro de `output_dir`.
+    output_dir : str, opcional
+        O diretório dos arquivos de saída quando `output_paths` não é informado. O padrão é uma string vazia (diretório atual).
+    max_workers : int, opcional
+        O número máximo de requisições simultâneas. O padrão é 16.
+    per_host : int, opcional
+        O número máximo de requisições simultâneas para um mesmo host. O padrão é 4.
+    timeout : float, opcional
+        O tempo de espera máximo de cada requisição, em segundos. O padrão é 30.
+    headers : dict, opcional
+        As configurações de cabeçalho das requisições. O padrão é um dicionário vazio.
+    params : dict, opcional
+        Os parâmetros das requisições. O padrão é um dicionário vazio.
+    cache_dir : str, opcional
+        Diretório de um cache de respostas em disco (ver html2txt). O padrão é uma string vazia (sem cache).
+    cache_size : int, opcional
+        Tamanho máximo em bytes dos conteúdos armazenados. O padrão é 256 MiB.
+    mode : str, opcional
+        'html' (HTML formatado) ou 'text' (apenas texto legível), como em html2txt. O padrão é 'html'.
+    parser : str, opcional
+        'bs4', 'lxml' ou 'html.parser', como em html2txt. O padrão é 'bs4'.
+
+    Retorna
+    -------
+    list
+        Um dicionário por URL, na mesma ordem, com as chaves 'url', 'output_path', 'status' (código de status HTTP ou None), 'elapsed' (segundos) e 'error' (None em caso de sucesso). Respostas com status 400 ou maior não são gravadas.
+    """
+    import os
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    urls = list(urls)
+    if output_paths is None:
+        output_paths = [
+            os.path.join(output_dir, f'{n}.txt') for n in range(len(urls))
+        ]
+    else:
+        output_paths = list(output_paths)
+        if len(output_paths) != len(urls):
+            raise ValueError(
+                'output_paths deve ter o mesmo número de itens que urls')
+
+    session = _pooled_session(max_workers)
+    results = [None] * len(urls)
+
+    def fetch(index):
+        url = urls[index]
+        result = {'url': url, 'output_path': None, 'status': None}
+        start = time.perf_counter()
+        try:
+            output_path = result['output_path'] = output_paths[index]
+            status = _fetch_html(session.get,
+                                 url,
+                                 output_path,
+                                 headers,
+                                 params,
+                                 timeout,
+                                 cache,
+                                 write_errors=False,
+                                 mode=mode,
+                                 parser=parser)
+            result['status'] = status
+            result['error'] = f'HTTP {status}' if status >= 400 else None
+        except Exception as e:
+            result['error'] = repr(e)
+        result['elapsed'] = time.perf_counter() - start
+        results[index] = result
+
+    cache = _HttpCache(cache_dir, cache_size) if cache_dir else None
+    try:
+        with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(job)
+                for job in _host_runners(urls, per_host, fetch)
+            ]
+            for future in futures:
+                future.result()
+        return results
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def html2txt_pipeline(urls,
+                      output_paths=None,
+                      output_dir: str = '',
+                      fetch_workers: int = 16,
+                      parse_workers: int = None,
+                      queue_size: int = 64,
+                      per_host: int = 4,
+                      timeout: float = 30,
+                      headers: dict = {},
+                      params: dict = {},
+                      mode: str = 'html',
+                      parser: str = 'bs4') -> tuple:
+    """
+    English:
+    ----------
+    Converts the HTML content of many URLs into text files in two stages: pages are downloaded by a pool of threads and placed in a bounded queue, and parsed and written by a pool of processes, so parsing is not limited by the GIL and scales with the number of cores. When the queue is full, downloads wait (backpressure). Statistics of each stage are returned to help size the pools.
+
+    Parameters
+    ----------
+    urls : iterable
+        The URLs to be converted.
+    output_paths : iterable, optional
+        The output file of each URL. If not provided, the files are named '<index>.txt' inside `output_dir`.
+    output_dir : str, optional
+        The directory of the output files when `output_paths` is not provided. The default is an empty string (current directory).
+    fetch_workers : int, optional
+        Number of download threads. The default is 16.
+    parse_workers : int, optional
+        Number of parsing processes. The default is the number of CPUs.
+    queue_size : int, optional
+        Maximum number of downloaded pages waiting to be parsed. The default is 64.
+    per_host : int, optional
+        The maximum number of simultaneous requests to the same host. The default is 4.
+    timeout : float, optional
+        The maximum wait time of each request, in seconds. The default is 30.
+    headers : dict, optional
+        The header settings of the requests. The default is an empty dictionary.
+    params : dict, optional
+        The parameters of the requests. The default is an empty dictionary.
+    mode : str, optional
+        'html' or 'text', as in html2txt. The default is 'html'.
+    parser : str, optional
+        'bs4', 'lxml' or 'html.parser', as in html2txt. The default is 'bs4'.
+
+    Returns
+    -------
+    tuple
+        (results, stats). `results` has one dictionary per URL, in the same order, with the keys 'url', 'output_path', 'status', 'fetch_time', 'queue_time', 'parse_time' and 'error'. `stats` has the keys 'fetch', 'queue' and 'parse', each with the number of items ('count') and the mean and maximum latency in seconds ('mean', 'max'); 'queue' also has the mean and maximum queue depth ('mean_depth', 'max_depth').
+
+    Português (brasileiro):
+    ----------
+    Converte o conteúdo HTML de várias URLs em arquivos de texto em duas etapas: as páginas são baixadas por um conjunto de threads e colocadas em uma fila limitada, e processadas e gravadas por um conjunto de processos, de modo que o processamento não é limitado pelo GIL e escala com o número de núcleos. Quando a fila está cheia, os downloads aguardam (contrapressão). As estatísticas de cada etapa são retornadas para ajudar a dimensionar os conjuntos.
+
+    Parâmetros
+    ----------
+    urls : iterable
+        As URLs a serem convertidas.
+    output_paths : iterable, opcional
+        O arquivo de saída de cada URL. Se não for informado, os arquivos são nomeados '<índice>.txt' dentro de `output_dir`.
+    output_dir : str, opcional
+        O diretório dos arquivos de saída quando `output_paths` não é informado. O padrão é uma string vazia (diretório atual).
+    fetch_workers : int, opcional
+        Número de threads de download. O padrão é 16.
+    parse_workers : int, opcional
+        Número de processos de processamento. O padrão é o número de CPUs.
+    queue_size : int, opcional
+        Número máximo de páginas baixadas aguardando processamento. O padrão é 64.
+    per_host : int, opcional
+        O número máximo de requisições simultâneas para um mesmo host. O padrão é 4.
+    timeout : float, opcional
+        O tempo de espera máximo de cada requisição, em segundos. O padrão é 30.
+    headers : dict, opcional
+        As configurações de cabeçalho das requisições. O padrão é um dicionário vazio.
+    params : dict, opcional
+        Os parâmetros das requisições. O padrão é um dicionário vazio.
+    mode : str, opcional
+        'html' ou 'text', como em html2txt. O padrão é 'html'.
+    parser : str, opcional
+        'bs4', 'lxml' ou 'html.parser', como em html2txt. O padrão é 'bs4'.
+
+    Retorna
+    -------
+    tuple
+        (results, stats). `results` tem um dicionário por URL, na mesma ordem, com as chaves 'url', 'output_path', 'status', 'fetch_time', 'queue_time', 'parse_time' e 'error'. `stats` tem as chaves 'fetch', 'queue' e 'parse', cada uma com o número de itens ('count') e a latência média e máxima em segundos ('mean', 'max'); 'queue' também tem a profundidade média e máxima da fila ('mean_depth', 'max_depth').
+    """
+    import os
+    import queue
+    import threading
+    import time
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    urls = list(urls)
+    if output_paths is None:
+        output_paths = [
+            os.path.join(output_dir, f'{n}.txt') for n in range(len(urls))
+        ]
+    else:
+        output_paths = list(output_paths)
+        if len(output_paths) != len(urls):
+            raise ValueError(
+                'output_paths deve ter o mesmo número de itens que urls')
+    results = [{
+        'url': url,
+        'output_path': output_path,
+        'status': None,
+        'fetch_time': None,
+        'queue_time': None,
+        'parse_time': None,
+        'error': None
+    } for url, output_path in zip(urls, output_paths)]
+
+    pages = queue.Queue(maxsize=queue_size)
+    depths = []
+    stop = threading.Event()
+    session = _pooled_session(fetch_workers)
+
+    def fetch(index):
+        if stop.is_set():
+            return
+        result = results[index]
+        html = None
+        start = time.perf_counter()
+        try:
+            response = session.get(result['url'],
+                                   headers=headers,
+                                   params=params,
+                                   timeout=timeout)
+            result['status'] = response.status_code
+            if response.status_code >= 400:
+                result['error'] = f'HTTP {response.status_code}'
+            else:
+                html = response.text
+        except Exception as e:
+            result['error'] = repr(e)
+        result['fetch_time'] = time.perf_counter() - start
+        depths.append(pages.qsize())
+        item = (index, html, time.perf_counter())
+        # Gives up if the consumer failed, instead of blocking on a full queue.
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    parse_slots = threading.Semaphore(2 * (parse_workers or os.cpu_count()))
+
+    def parsed(index, future):
+        parse_slots.release()
+        try:
+            results[index]['parse_time'] = future.result()
+        except Exception as e:
+            results[index]['error'] = repr(e)
+
+    with session, ThreadPoolExecutor(
+            max_workers=fetch_workers) as fetchers, ProcessPoolExecutor(
+                max_workers=parse_workers) as parsers:
+        for job in _host_runners(urls, per_host, fetch):
+            fetchers.submit(job)
+
+        try:
+            for _ in range(len(urls)):
+                index, html, queued = pages.get()
+                results[index]['queue_time'] = time.perf_counter() - queued
+                if html is None:
+                    continue
+                parse_slots.acquire()
+                future = parsers.submit(_timed_convert, html,
+                                        results[index]['output_path'], mode,
+                                        parser)
+                future.add_done_callback(
+                    lambda future, index=index: parsed(index, future))
+        except BaseException:
+            stop.set()
+            while True:
+                try:
+                    pages.get_nowait()
+                except queue.Empty:
+                    break
+            raise
+
+    def summary(key):
+        values = [r[key] for r in results if r[key] is not None]
+        return {
+            'count': len(values),
+            'mean': sum(values) / len(values) if values else 0.0,
+            'max': max(values, default=0.0)
+        }
+
+    stats = {
+        'fetch': summary('fetch_time'),
+        'queue': summary('queue_time'),
+        'parse': summary('parse_time')
+    }
+    stats['queue']['mean_depth'] = sum(depths) / len(depths) if depths else 0.0
+    stats['queue']['max_depth'] = max(depths, default=0)
+    return results, stats
+
+
+def http_cache_stats(cache_dir: str) -> dict:
+    """
+    English:
+    ----------
+    Returns the statistics of an on-disk response cache used by html2txt or html2txt_many.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of the cache.
+
+    Returns
+    -------
+    dict
+        A dictionary with the number of hits ('hits', pages revalidated with 304), misses ('misses', full downloads), stored pages ('entries') and stored bytes ('bytes').
+
+    Português (brasileiro):
+    ----------
+    Retorna as estatísticas de um cache de respostas em disco usado por html2txt ou html2txt_many.
+
+    Parâmetros
+    ----------
+    cache_dir : str
+        Diretório do cache.
+
+    Retorna
+    -------
+    dict
+        Um dicionário com o número de acertos ('hits', páginas revalidadas com 304), falhas ('misses', downloads completos), páginas armazenadas ('entries') e bytes armazenados ('bytes').
+    """
+    cache = _HttpCache(cache_dir)
+    try:
+        stats = dict(cache.connection.execute('SELECT name, value FROM stats'))
+        stats['entries'], stats['bytes'] = cache.connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return stats
+    finally:
+        cache.close()
+
+
+def normalize_url(url: str, base: str = '') -> str:
+    """
+    English:
+    ----------
+    Converts a URL into a canonical form, so that equivalent URLs are written the same way: the scheme and host are lowercased, default ports, fragments and dot segments are removed, percent escapes are uppercased and query parameters are sorted.
+
+    Parameters
+    ----------
+    url : str
+        The URL to be normalized. It can be relative to `base`.
+    base : str, optional
+        The URL used to resolve relative URLs. The default is an empty string.
+
+    Returns
+    -------
+    str
+        The normalized URL.
+
+    Português (brasileiro):
+    ----------
+    Converte uma URL para uma forma canônica, de modo que URLs equivalentes sejam escritas da mesma forma: o esquema e o host ficam em minúsculas, portas padrão, fragmentos e segmentos com pontos são removidos, códigos de escape ficam em maiúsculas e os parâmetros da consulta são ordenados.
+
+    Parâmetros
+    ----------
+    url : str
+        A URL a ser normalizada. Pode ser relativa a `base`.
+    base : str, opcional
+        A URL usada para resolver URLs relativas. O padrão é uma string vazia.
+
+    Retorna
+    -------
+    str
+        A URL normalizada.
+    """
+    import posixpath
+    import re
+    from urllib.parse import (parse_qsl, urldefrag, urlencode, urljoin,
+                              urlsplit, urlunsplit)
+
+    url = urldefrag(urljoin(base, url.strip()))[0]
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f'[{host}]'
+    port = parts.port
+    if port is not None and (scheme, port) not in (('http', 80), ('https', 443)):
+        host += f':{port}'
+    if parts.username is not None:
+        credentials = parts.username
+        if parts.password is not None:
+            credentials += f':{parts.password}'
+        host = f'{credentials}@{host}'
+
+    path = parts.path or '/'
+    normalized = posixpath.normpath(path)
+    if normalized.startswith('//'):
+        normalized = '/' + normalized.lstrip('/')
+    if path.endswith('/') and normalized != '/':
+        normalized += '/'
+    path = re.sub(r'%[0-9a-fA-F]{2}', lambda m: m.group().upper(), normalized)
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class _BloomFilter:
+    """Bloom filter sized for `capacity` items at a false-positive rate of
+    `error_rate`. The k bit positions come from one blake2b digest split into
+    two 64-bit hashes (double hashing)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        import math
+
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2)**2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        import hashlib
+
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + n * second) % self.size for n in range(self.hashes))
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7))
+                   for p in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Adds an item and returns True if it was not already present."""
+        added = False
+        for p in self._positions(item):
+            if not self.bits[p >> 3] & (1 << (p & 7)):
+                self.bits[p >> 3] |= 1 << (p & 7)
+                added = True
+        return added
+
+
+class _Fingerprints:
+    """Exact visited set storing 64-bit hashes instead of URL strings."""
+
+    def __init__(self):
+        self.items = set()
+
+    @staticmethod
+    def _fingerprint(item: str) -> int:
+        import hashlib
+
+        return int.from_bytes(
+            hashlib.blake2b(item.encode(), digest_size=8).digest(), 'little')
+
+    def __contains__(self, item: str) -> bool:
+        return self._fingerprint(item) in self.items
+
+    def add(self, item: str) -> bool:
+        """Adds an item and returns True if it was not already present."""
+        fingerprint = self._fingerprint(item)
+        if fingerprint in self.items:
+            return False
+        self.items.add(fingerprint)
+        return True
+
+
+def _link_extractor():
+    """Returns an HTMLParser that collects the href of <a> and <area> tags
+    and the <base href> of a page."""
+    from html.parser import HTMLParser
+
+    class LinkExtractor(HTMLParser):
+
+        def __init__(self):
+            super().__init__(convert_charrefs=True)
+            self.base = ''
+            self.links = []
+
+        def handle_starttag(self, tag, attrs):
+            attrs = dict(attrs)
+            if tag == 'base' and attrs.get('href') and not self.base:
+                self.base = attrs['href']
+            elif tag in ('a', 'area') and attrs.get('href'):
+                self.links.append(attrs['href'])
+
+    return LinkExtractor()
+
+
+def crawl(start_urls,
+          output_dir: str = '',
+          max_depth: int = 2,
+          max_pages: int = 1000,
+          allowed_domains=None,
+          delay: float = 1.0,
+          expected_urls: int = 1000000,
+          fp_rate: float = 0.001,
+          checkpoint: str = '',
+          checkpoint_every: int = 50,
+          timeout: float = 30,
+          headers: dict = {},
+          mode: str = 'text',
+          parser: str = 'bs4'):
+    """
+    English:
+    ----------
+    Crawls websites following links and converts each page with html2txt. URLs are normalized (see normalize_url) and the visited set is stored compactly, as a Bloom filter or as 64-bit fingerprints. Requests to the same host are spaced by `delay` seconds, and the crawl can be saved to a checkpoint file and resumed after a restart without fetching pages again.
+
+    Parameters
+    ----------
+    start_urls : iterable
+        The URLs where the crawl starts (depth 0).
+    output_dir : str, optional
+        The directory of the output files, named '<index>.txt'. The default is an empty string (current directory).
+    max_depth : int, optional
+        The maximum number of links followed from a start URL. The default is 2.
+    max_pages : int, optional
+        The maximum number of pages fetched in this call. The default is 1000.
+    allowed_domains : iterable, optional
+        Domains that can be visited (subdomains included). The default is None (the domains of the start URLs).
+    delay : float, optional
+        Minimum time in seconds between two requests to the same host. The default is 1 second.
+    expected_urls : int, optional
+        Number of URLs used to size the Bloom filter. The default is 1000000.
+    fp_rate : float, optional
+        False-positive rate of the Bloom filter (the chance of skipping an unvisited URL). If 0, exact 64-bit fingerprints are used instead. The default is 0.001.
+    checkpoint : str, optional
+        Path of the checkpoint file. If it exists, the crawl is resumed from it: new `start_urls` and `allowed_domains` are added to the saved ones, and start URLs already visited are ignored. The default is an empty string (no checkpoint).
+    checkpoint_every : int, optional
+        Number of pages between checkpoint saves. The default is 50.
+    timeout : float, optional
+        The maximum wait time of each request, in seconds. The default is 30.
+    headers : dict, optional
+        The header settings of the requests. The default is an empty dictionary.
+    mode : str, optional
+        'html' or 'text', as in html2txt. The default is 'text'.
+    parser : str, optional
+        'bs4', 'lxml' or 'html.parser', as in html2txt. The default is 'bs4'.
+
+    Yields
+    -------
+    dict
+        One dictionary per fetched page, with the keys 'url', 'depth', 'output_path', 'status' and 'error'.
+
+    Português (brasileiro):
+    ----------
+    Percorre sites seguindo links e converte cada página com html2txt. As URLs são normalizadas (ver normalize_url) e o conjunto de URLs visitadas é armazenado de forma compacta, como um filtro de Bloom ou como impressões digitais de 64 bits. Requisições para um mesmo host são espaçadas em `delay` segundos, e a execução pode ser salva em um arquivo de checkpoint e retomada após uma reinicialização sem baixar as páginas novamente.
+
+    Parâmetros
+    ----------
+    start_urls : iterable
+        As URLs onde a execução começa (profundidade 0).
+    output_dir : str, opcional
+        O diretório dos arquivos de saída, nomeados '<índice>.txt'. O padrão é uma string vazia (diretório atual).
+    max_depth : int, opcional
+        O número máximo de links seguidos a partir de uma URL inicial. O padrão é 2.
+    max_pages : int, opcional
+        O número máximo de páginas baixadas nesta chamada. O padrão é 1000.
+    allowed_domains : iterable, opcional
+        Domínios que podem ser visitados (incluindo subdomínios). O padrão é None (os domínios das URLs iniciais).
+    delay : float, opcional
+        Tempo mínimo em segundos entre duas requisições para um mesmo host. O padrão é 1 segundo.
+    expected_urls : int, opcional
+        Número de URLs usado para dimensionar o filtro de Bloom. O padrão é 1000000.
+    fp_rate : float, opcional
+        Taxa de falsos positivos do filtro de Bloom (a chance de ignorar uma URL não visitada). Se 0, são usadas impressões digitais exatas de 64 bits. O padrão é 0.001.
+    checkpoint : str, opcional
+        Caminho do arquivo de checkpoint. Se existir, a execução é retomada a partir dele: novas `start_urls` e `allowed_domains` são adicionadas às salvas, e URLs iniciais já visitadas são ignoradas. O padrão é uma string vazia (sem checkpoint).
+    checkpoint_every : int, opcional
+        Número de páginas entre os salvamentos do checkpoint. O padrão é 50.
+    timeout : float, opcional
+        O tempo de espera máximo de cada requisição, em segundos. O padrão é 30.
+    headers : dict, opcional
+        As configurações de cabeçalho das requisições. O padrão é um dicionário vazio.
+    mode : str, opcional
+        'html' ou 'text', como em html2txt. O padrão é 'text'.
+    parser : str, opcional
+        'bs4', 'lxml' ou 'html.parser', como em html2txt. O padrão é 'bs4'.
+
+    Gera
+    -------
+    dict
+        Um dicionário por página baixada, com as chaves 'url', 'depth', 'output_path', 'status' e 'error'.
+    """
+    import heapq
+    import os
+    import pickle
+    import time
+    from collections import deque
+    from urllib.parse import urlsplit
+
+    def host_of(url):
+        return urlsplit(url).hostname or ''
+
+    state = None
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint, 'rb') as f:
+            state = pickle.load(f)
+    if state is None:
+        state = {
+            'visited': _BloomFilter(expected_urls, fp_rate)
+            if fp_rate > 0 else _Fingerprints(),
+            'frontier': dict(),
+            'pages': 0,
+            'allowed': []
+        }
+    start_urls = [normalize_url(url) for url in start_urls]
+    state['allowed'] = sorted(
+        set(state['allowed'])
+        | set(allowed_domains or {host_of(url)
+                                  for url in start_urls}))
+    for url in start_urls:
+        if state['visited'].add(url):
+            state['frontier'].setdefault(host_of(url), deque()).append(
+                (url, 0))
+
+    visited = state['visited']
+    frontier = state['frontier']
+    allowed = [domain.lower().lstrip('.') for domain in state['allowed']]
+    ready = [(0.0, host) for host in frontier if frontier[host]]
+    heapq.heapify(ready)
+    # Hosts stay spaced by `delay` even after their queue drains and a later
+    # link brings them back.
+    last_fetch = dict()
+
+    def save():
+        if checkpoint:
+            with open(f'{checkpoint}.tmp', 'wb') as f:
+                pickle.dump(state, f)
+            os.replace(f'{checkpoint}.tmp', checkpoint)
+
+    def is_allowed(url):
+        host = host_of(url)
+        return urlsplit(url).scheme in ('http', 'https') and any(
+            host == domain or host.endswith(f'.{domain}')
+            for domain in allowed)
+
+    session = _pooled_session(1)
+    fetched = 0
+    try:
+        while ready and fetched < max_pages:
+            ready_at, host = heapq.heappop(ready)
+            wait = ready_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            url, depth = frontier[host].popleft()
+
+            output_path = os.path.join(output_dir, f'{state["pages"]}.txt')
+            result = {
+                'url': url,
+                'depth': depth,
+                'output_path': output_path,
+                'status': None,
+                'error': None
+            }
+            try:
+                response = session.get(url, headers=headers, timeout=timeout)
+                result['status'] = response.status_code
+                if response.status_code >= 400:
+                    result['error'] = f'HTTP {response.status_code}'
+                elif 'html' in response.headers.get('Content-Type', 'html'):
+                    html2txt(response=response,
+                             output_path=output_path,
+                             mode=mode,
+                             parser=parser)
+                    if depth < max_depth:
+                        links = _link_extractor()
+                        links.feed(response.text)
+                        links.close()
+                        base = response.url
+                        if links.base:
+                            try:
+                                base = normalize_url(links.base, base)
+                            except ValueError:
+                                pass
+                        for link in links.links:
+                            try:
+                                link = normalize_url(link, base)
+                            except ValueError:
+                                continue
+                            if is_allowed(link) and visited.add(link):
+                                link_host = host_of(link)
+                                if link_host not in frontier:
+                                    frontier[link_host] = deque()
+                                    ready_at = (last_fetch[link_host] + delay
+                                                if link_host in last_fetch else
+                                                0.0)
+                                    heapq.heappush(ready, (ready_at, link_host))
+                                frontier[link_host].append((link, depth + 1))
+                else:
+                    result['error'] = 'Conteúdo não é HTML'
+            except Exception as e:
+                result['error'] = repr(e)
+
+            last_fetch[host] = time.monotonic()
+            if frontier[host]:
+                heapq.heappush(ready, (last_fetch[host] + delay, host))
+            else:
+                del frontier[host]
+            state['pages'] += 1
+            fetched += 1
+            if state['pages'] % checkpoint_every == 0:
+                save()
+            yield result
+    finally:
+        session.close()
+        save()
+
+
+def verify_proxy(ip: str,
+                 port: str | int,
+                 timeout: int = 5,
+                 verbose: int = 1,
+                 echo_url: str = 'https://httpbin.org/ip'):
     """
     English:
     ----------
@@ -139,6 +1496,8 @@ def verify_proxy(ip: str, port: str | int, timeout: int = 5, verbose: int = 1):
         The maximum wait time for the connection to the proxy to be established. The default is 5 seconds.
     verbose : int, optional
         If 1, displays log messages with information about exceptions that occurred during proxy check. The default is 1.
+    echo_url : str, optional
+        The URL that returns, in JSON, the origin IP address of the request (key 'origin'). The default is 'https://httpbin.org/ip'.
 
     Returns
     -------
@@ -159,6 +1518,8 @@ def verify_proxy(ip: str, port: str | int, timeout: int = 5, verbose: int = 1):
         O tempo de espera máximo para a conexão com o proxy ser estabelecida. O padrão é 5 segundos.
     verbose : int, opcional
         Se 1, exibe mensagens de log com informações sobre exceções que ocorreram durante a verificação do proxy. O padrão é 1.
+    echo_url : str, opcional
+        A URL que retorna, em JSON, o endereço IP de origem da solicitação (chave 'origin'). O padrão é 'https://httpbin.org/ip'.
 
     Retorna
     -------
@@ -170,7 +1531,7 @@ def verify_proxy(ip: str, port: str | int, timeout: int = 5, verbose: int = 1):
 
     proxy = f'{ip}:{str(port)}'
     try:
-        response = re.get('https://httpbin.org/ip',
+        response = re.get(echo_url,
                           proxies={
                               'http': proxy,
                               'https': proxy
@@ -182,4 +1543,722 @@ def verify_proxy(ip: str, port: str | int, timeout: int = 5, verbose: int = 1):
             return False
     except Exception as e:
         if verbose == 1: log.exception(e)
-        return False
\ No newline at end of file
+        return False
+
+
+def _split_proxy(proxy) -> tuple:
+    """Accepts 'ip:port' strings or (ip, port) pairs."""
+    if isinstance(proxy, str):
+        ip, _, port = proxy.rpartition(':')
+        return ip, int(port)
+    ip, port = proxy
+    return ip, int(port)
+
+
+async def _read_http_response(reader) -> tuple:
+    """Reads an HTTP/1.1 response and returns (status, body)."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {
+        name.strip().lower(): value.strip()
+        for name, _, value in (line.partition(':') for line in lines[1:] if line)
+    }
+    if 'chunked' in headers.get('transfer-encoding', ''):
+        body = b''
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+    return status, body
+
+
+async def _probe_proxy(ip: str, port: int, echo_url: str, timeout: float,
+                       ssl_context) -> dict:
+    """Requests `echo_url` through the proxy ip:port using a raw asyncio
+    connection, timing the TCP connect and the whole check."""
+    import asyncio
+    import json
+    import time
+    from urllib.parse import urlsplit
+
+    result = {
+        'proxy': f'{ip}:{port}',
+        'ip': ip,
+        'port': port,
+        'valid': False,
+        'connect_time': None,
+        'latency': None,
+        'error': None
+    }
+    url = urlsplit(echo_url)
+    secure = url.scheme == 'https'
+    host = url.hostname
+    target = f'{host}:{url.port or (443 if secure else 80)}'
+    path = (url.path or '/') + (f'?{url.query}' if url.query else '')
+
+    async def check():
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(ip, port)
+        result['connect_time'] = time.perf_counter() - start
+        try:
+            if secure:
+                writer.write(f'CONNECT {target} HTTP/1.1\r\n'
+                             f'Host: {target}\r\n\r\n'.encode())
+                head = await reader.readuntil(b'\r\n\r\n')
+                if int(head.split()[1]) != 200:
+                    raise ConnectionError(head.split(b'\r\n')[0].decode())
+                if hasattr(writer, 'start_tls'):
+                    await writer.start_tls(ssl_context, server_hostname=host)
+                else:
+                    loop = asyncio.get_running_loop()
+                    protocol = writer.transport.get_protocol()
+                    transport = await loop.start_tls(writer.transport,
+                                                     protocol,
+                                                     ssl_context,
+                                                     server_hostname=host)
+                    writer = asyncio.StreamWriter(transport, protocol, reader,
+                                                  loop)
+                request_target = path
+            else:
+                request_target = echo_url
+            writer.write(f'GET {request_target} HTTP/1.1\r\n'
+                         f'Host: {target}\r\n'
+                         'Accept: application/json\r\n'
+                         'Connection: close\r\n\r\n'.encode())
+            status, body = await _read_http_response(reader)
+            if status != 200:
+                raise ConnectionError(f'HTTP {status}')
+            origin = json.loads(body)['origin']
+            result['latency'] = time.perf_counter() - start
+            result['valid'] = origin == ip
+            if not result['valid']:
+                result['error'] = f'Origem {origin}'
+        finally:
+            writer.close()
+
+    try:
+        await asyncio.wait_for(check(), timeout)
+    except asyncio.TimeoutError:
+        result['error'] = 'Tempo esgotado'
+    except Exception as e:
+        result['error'] = repr(e)
+    return result
+
+
+def _socket_budget(wanted: int) -> int:
+    """Raises the soft limit of open files (where supported) so that
+    `wanted` sockets fit, returning how many can actually be used."""
+    try:
+        import resource
+    except ImportError:
+        return wanted
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft != resource.RLIM_INFINITY and soft < wanted + 64:
+            target = wanted + 64
+            if hard != resource.RLIM_INFINITY:
+                target = min(target, hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        if soft == resource.RLIM_INFINITY:
+            return wanted
+        return max(1, min(wanted, soft - 64))
+    except (ValueError, OSError):
+        return wanted
+
+
+def _stream_from_loop(main):
+    """Runs the coroutine `main(emit, stop)` on an event loop in a background
+    thread and yields each item it emits, as soon as it is emitted."""
+    import asyncio
+    import queue
+    import threading
+
+    results = queue.Queue()
+    stop = threading.Event()
+    done = object()
+    error = []
+
+    def run():
+        try:
+            asyncio.run(main(results.put, stop))
+        except BaseException as e:
+            # Raised again in the consumer instead of ending the results early.
+            error.append(e)
+        finally:
+            results.put(done)
+
+    threading.Thread(target=run, daemon=True).start()
+    try:
+        while True:
+            result = results.get()
+            if result is done:
+                break
+            yield result
+    finally:
+        stop.set()
+    if error:
+        raise error[0]
+
+
+def _proxy_result(proxy, **fields) -> dict:
+    """Result dictionary of a proxy check that did not reach the HTTP probe."""
+    try:
+        ip, port = _split_proxy(proxy)
+    except (TypeError, ValueError):
+        ip, port = None, None
+    result = {
+        'proxy': f'{ip}:{port}' if ip is not None else str(proxy),
+        'ip': ip,
+        'port': port,
+        'valid': False,
+        'connect_time': None,
+        'latency': None,
+        'error': None
+    }
+    result.update(fields)
+    return result
+
+
+async def _tcp_connect(ip: str, port: int, timeout: float) -> tuple:
+    """Opens and closes a non-blocking TCP connection to ip:port, returning
+    (connect_time, error)."""
+    import asyncio
+    import socket
+    import time
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)),
+                                   timeout)
+        return time.perf_counter() - start, None
+    except asyncio.TimeoutError:
+        return None, 'Tempo esgotado'
+    except OSError as e:
+        return None, repr(e)
+
+
+async def _tcp_phase(proxies, timeout: float, concurrency: int, emit, stop,
+                     passed=None):
+    """Checks the TCP port of each proxy with up to `concurrency` sockets.
+    Proxies that fail are emitted; the ones that pass are emitted too, or
+    put on the asyncio queue `passed` if given."""
+    import asyncio
+
+    done = object()
+
+    async def worker():
+        while not stop.is_set():
+            proxy = next(proxies, done)
+            if proxy is done:
+                return
+            try:
+                ip, port = _split_proxy(proxy)
+            except (TypeError, ValueError) as e:
+                emit(_proxy_result(proxy, error=repr(e)))
+                continue
+            connect_time, error = await _tcp_connect(ip, port, timeout)
+            result = _proxy_result(proxy,
+                                   connect_time=connect_time,
+                                   error=error)
+            if passed is not None and error is None:
+                await passed.put((ip, port))
+            else:
+                result['valid'] = error is None
+                emit(result)
+
+    await asyncio.gather(*(worker()
+                           for _ in range(_socket_budget(concurrency))))
+
+
+def tcp_prefilter(proxies, timeout: float = 1.0, concurrency: int = 2000):
+    """
+    English:
+    ----------
+    This function quickly discards dead proxies: it only opens a non-blocking TCP connection to the IP address and port of each proxy, with thousands of connections at once, and yields each result as soon as it finishes. No HTTP request is made; the proxies that pass can then be checked with verify_proxies (or use verify_proxies(..., prefilter=True)).
+
+    Parameters
+    ----------
+    proxies : iterable
+        The proxies to be checked, as 'ip:port' strings or (ip, port) pairs. It is consumed lazily.
+    timeout : float, optional
+        The maximum time of each connection, in seconds. The default is 1 second.
+    concurrency : int, optional
+        The maximum number of simultaneous connections. It is reduced if the limit of open files of the system is lower. The default is 2000.
+
+    Yields
+    -------
+    dict
+        One dictionary per proxy, in completion order, with the keys 'proxy', 'ip', 'port', 'valid' (True if the port accepted the connection), 'connect_time', 'latency' (always None) and 'error'.
+
+    Português (brasileiro):
+    ----------
+    Esta função descarta rapidamente proxies inativos: apenas abre uma conexão TCP não bloqueante com o endereço IP e a porta de cada proxy, com milhares de conexões ao mesmo tempo, e gera cada resultado assim que termina. Nenhuma requisição HTTP é feita; os proxies aprovados podem então ser verificados com verify_proxies (ou use verify_proxies(..., prefilter=True)).
+
+    Parâmetros
+    ----------
+    proxies : iterable
+        Os proxies a serem verificados, como strings 'ip:porta' ou pares (ip, porta). É consumido sob demanda.
+    timeout : float, opcional
+        O tempo máximo de cada conexão, em segundos. O padrão é 1 segundo.
+    concurrency : int, opcional
+        O número máximo de conexões simultâneas. É reduzido se o limite de arquivos abertos do sistema for menor. O padrão é 2000.
+
+    Gera
+    -------
+    dict
+        Um dicionário por proxy, na ordem de conclusão, com as chaves 'proxy', 'ip', 'port', 'valid' (True se a porta aceitou a conexão), 'connect_time', 'latency' (sempre None) e 'error'.
+    """
+    proxies = iter(proxies)
+
+    async def main(emit, stop):
+        await _tcp_phase(proxies, timeout, concurrency, emit, stop)
+
+    return _stream_from_loop(main)
+
+
+def verify_proxies(proxies,
+                   echo_url: str = 'https://httpbin.org/ip',
+                   timeout: float = 5,
+                   concurrency: int = 500,
+                   prefilter: bool = False,
+                   prefilter_timeout: float = 1.0,
+                   prefilter_concurrency: int = 2000):
+    """
+    English:
+    ----------
+    This function checks many proxies concurrently, like verify_proxy, and yields each result as soon as its check finishes. The checks run on an asyncio event loop in a background thread, with up to `concurrency` connections open at once, and record the time to connect to the proxy and the total time to receive the answer of the echo server.
+
+    Parameters
+    ----------
+    proxies : iterable
+        The proxies to be checked, as 'ip:port' strings or (ip, port) pairs. It is consumed lazily, so it can be a generator over a large file.
+    echo_url : str, optional
+        The URL that returns, in JSON, the origin IP address of the request (key 'origin'). The default is 'https://httpbin.org/ip'.
+    timeout : float, optional
+        The maximum time of each check, in seconds. The default is 5 seconds.
+    concurrency : int, optional
+        The maximum number of proxies checked at the same time. The default is 500.
+    prefilter : bool, optional
+        If True, a first phase only opens a TCP connection to each proxy (see tcp_prefilter), and only the proxies that accept it are checked over HTTP. Useful for large public lists, where most ports are dead. The default is False.
+    prefilter_timeout : float, optional
+        The maximum time of each TCP connection of the first phase, in seconds. The default is 1 second.
+    prefilter_concurrency : int, optional
+        The maximum number of simultaneous TCP connections of the first phase. Both phases run at the same time, so if the limit of open files of the system is lower than this plus `concurrency`, both are reduced in proportion. The default is 2000.
+
+    Yields
+    -------
+    dict
+        One dictionary per proxy, in completion order, with the keys 'proxy', 'ip', 'port', 'valid', 'connect_time', 'latency' (both in seconds, or None) and 'error'.
+
+    Português (brasileiro):
+    ----------
+    Esta função verifica vários proxies de forma concorrente, como verify_proxy, e gera cada resultado assim que sua verificação termina. As verificações são executadas em um loop de eventos asyncio numa thread em segundo plano, com até `concurrency` conexões abertas ao mesmo tempo, e registram o tempo de conexão com o proxy e o tempo total até a resposta do servidor de eco.
+
+    Parâmetros
+    ----------
+    proxies : iterable
+        Os proxies a serem verificados, como strings 'ip:porta' ou pares (ip, porta). É consumido sob demanda, podendo ser um gerador sobre um arquivo grande.
+    echo_url : str, opcional
+        A URL que retorna, em JSON, o endereço IP de origem da solicitação (chave 'origin'). O padrão é 'https://httpbin.org/ip'.
+    timeout : float, opcional
+        O tempo máximo de cada verificação, em segundos. O padrão é 5 segundos.
+    concurrency : int, opcional
+        O número máximo de proxies verificados ao mesmo tempo. O padrão é 500.
+    prefilter : bool, opcional
+        Se True, uma primeira fase apenas abre uma conexão TCP com cada proxy (ver tcp_prefilter), e somente os proxies que a aceitam são verificados por HTTP. Útil para listas públicas grandes, onde a maioria das portas está inativa. O padrão é False.
+    prefilter_timeout : float, opcional
+        O tempo máximo de cada conexão TCP da primeira fase, em segundos. O padrão é 1 segundo.
+    prefilter_concurrency : int, opcional
+        O número máximo de conexões TCP simultâneas da primeira fase. As duas fases rodam ao mesmo tempo, então se o limite de arquivos abertos do sistema for menor que este valor somado a `concurrency`, ambos são reduzidos proporcionalmente. O padrão é 2000.
+
+    Gera
+    -------
+    dict
+        Um dicionário por proxy, na ordem de conclusão, com as chaves 'proxy', 'ip', 'port', 'valid', 'connect_time', 'latency' (ambos em segundos, ou None) e 'error'.
+    """
+    import asyncio
+    import ssl
+
+    proxies = iter(proxies)
+    ssl_context = ssl.create_default_context()
+    done = object()
+
+    # Both phases hold sockets at the same time, so they share one budget of
+    # open files, split in proportion to what each one asked for.
+    wanted = concurrency + (prefilter_concurrency if prefilter else 0)
+    budget = _socket_budget(wanted)
+    tcp_workers = max(1, budget * prefilter_concurrency // wanted)
+    http_workers = max(1, budget - tcp_workers) if prefilter else budget
+
+    async def main(emit, stop):
+        passed = asyncio.Queue(http_workers) if prefilter else None
+
+        async def tcp():
+            await _tcp_phase(proxies, prefilter_timeout, tcp_workers, emit,
+                             stop, passed)
+            for _ in range(http_workers):
+                await passed.put(done)
+
+        async def next_proxy():
+            if passed is not None:
+                return await passed.get()
+            return next(proxies, done)
+
+        async def worker():
+            # With the prefilter, keeps draining the queue after a stop so
+            # the TCP phase never blocks on a full queue.
+            while passed is not None or not stop.is_set():
+                proxy = await next_proxy()
+                if proxy is done:
+                    return
+                if stop.is_set():
+                    continue
+                try:
+                    ip, port = _split_proxy(proxy)
+                except (TypeError, ValueError) as e:
+                    emit(_proxy_result(proxy, error=repr(e)))
+                    continue
+                emit(await _probe_proxy(ip, port, echo_url, timeout,
+                                        ssl_context))
+
+        workers = [worker() for _ in range(http_workers)]
+        if prefilter:
+            workers.append(tcp())
+        await asyncio.gather(*workers)
+
+    return _stream_from_loop(main)
+
+
+class _FenwickTree:
+    """Binary indexed tree of non-negative weights supporting O(log n)
+    updates and O(log n) sampling proportional to the weights."""
+
+    def __init__(self, size: int = 0):
+        self.weights = [0.0] * size
+        self.tree = [0.0] * (size + 1)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def total(self) -> float:
+        total, i = 0.0, len(self.weights)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def append(self, weight: float) -> int:
+        """Adds a slot at the end and returns its index."""
+        i = len(self.weights) + 1
+        # Node i covers the slots (i - lowbit(i), i]; sums the children.
+        node, step = weight, 1
+        while step < i & -i:
+            node += self.tree[i - step]
+            step <<= 1
+        self.weights.append(weight)
+        self.tree.append(node)
+        return i - 1
+
+    def set(self, index: int, weight: float):
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        i = index + 1
+        while i <= len(self.weights):
+            self.tree[i] += delta
+            i += i & -i
+
+    def rebuild(self):
+        """Recomputes the tree from the weights, discarding the rounding
+        errors accumulated by many updates."""
+        self.tree = [0.0] + list(self.weights)
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def find(self, value: float) -> int:
+        """Returns the index of the slot where the running sum of the
+        weights exceeds `value`."""
+        index, bit = 0, 1 << len(self.weights).bit_length()
+        while bit:
+            nxt = index + bit
+            if nxt <= len(self.weights) and self.tree[nxt] <= value:
+                index = nxt
+                value -= self.tree[nxt]
+            bit >>= 1
+        return min(index, len(self.weights) - 1)
+
+
+class ProxyPool:
+    """
+    English:
+    ----------
+    Pool of proxies that picks one at random for each request, weighted by its health: the success rate divided by the latency, both as exponential moving averages of the reported results. Picks and updates cost O(log n). A proxy is removed after `max_failures` consecutive failures, and a background thread can revalidate the proxies with the same check used by verify_proxies, at most `revalidate_rate` checks per second.
+
+    Parameters
+    ----------
+    proxies : iterable
+        The initial proxies: 'ip:port' strings, (ip, port) pairs or the dictionaries yielded by verify_proxies (invalid ones are skipped and their latency is used as the initial value).
+    max_failures : int, optional
+        Number of consecutive failures that removes a proxy. The default is 3.
+    smoothing : float, optional
+        Weight of the newest result in the moving averages. The default is 0.3.
+    revalidate_rate : float, optional
+        Maximum number of background checks per second. If 0, the background thread is not started. The default is 0.
+    revalidate_interval : float, optional
+        Minimum time in seconds between two checks of the same proxy. The default is 300 seconds.
+    echo_url : str, optional
+        The echo URL of the background checks (see verify_proxies). The default is 'https://httpbin.org/ip'.
+    timeout : float, optional
+        The maximum time of each background check, in seconds. The default is 5 seconds.
+
+    Português (brasileiro):
+    ----------
+    Conjunto de proxies que sorteia um para cada requisição, com peso proporcional à sua saúde: a taxa de sucesso dividida pela latência, ambas como médias móveis exponenciais dos resultados informados. Sorteios e atualizações custam O(log n). Um proxy é removido após `max_failures` falhas consecutivas, e uma thread em segundo plano pode revalidar os proxies com a mesma verificação usada por verify_proxies, com no máximo `revalidate_rate` verificações por segundo.
+
+    Parâmetros
+    ----------
+    proxies : iterable
+        Os proxies iniciais: strings 'ip:porta', pares (ip, porta) ou os dicionários gerados por verify_proxies (os inválidos são ignorados e a latência é usada como valor inicial).
+    max_failures : int, opcional
+        Número de falhas consecutivas que remove um proxy. O padrão é 3.
+    smoothing : float, opcional
+        Peso do resultado mais recente nas médias móveis. O padrão é 0.3.
+    revalidate_rate : float, opcional
+        Número máximo de verificações em segundo plano por segundo. Se 0, a thread em segundo plano não é iniciada. O padrão é 0.
+    revalidate_interval : float, opcional
+        Tempo mínimo em segundos entre duas verificações de um mesmo proxy. O padrão é 300 segundos.
+    echo_url : str, opcional
+        A URL de eco das verificações em segundo plano (ver verify_proxies). O padrão é 'https://httpbin.org/ip'.
+    timeout : float, opcional
+        O tempo máximo de cada verificação em segundo plano, em segundos. O padrão é 5 segundos.
+    """
+
+    _DEFAULT_LATENCY = 1.0
+    _MIN_LATENCY = 0.001
+
+    def __init__(self,
+                 proxies=(),
+                 max_failures: int = 3,
+                 smoothing: float = 0.3,
+                 revalidate_rate: float = 0,
+                 revalidate_interval: float = 300,
+                 echo_url: str = 'https://httpbin.org/ip',
+                 timeout: float = 5):
+        import threading
+
+        self.max_failures = max_failures
+        self.smoothing = smoothing
+        self.revalidate_interval = revalidate_interval
+        self.echo_url = echo_url
+        self.timeout = timeout
+        self._tree = _FenwickTree()
+        self._slots = dict()
+        self._stats = []
+        self._free = []
+        self._checks = [] if revalidate_rate > 0 else None
+        self._updates = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        for proxy in proxies:
+            if isinstance(proxy, dict):
+                if proxy.get('valid'):
+                    self.add(proxy['proxy'], proxy.get('latency'))
+            else:
+                self.add(proxy)
+
+        if revalidate_rate > 0:
+            self._thread = threading.Thread(target=self._revalidate,
+                                            args=(1 / revalidate_rate, ),
+                                            daemon=True)
+            self._thread.start()
+
+    def _weight(self, stats: dict) -> float:
+        return stats['success'] / max(stats['latency'], self._MIN_LATENCY)
+
+    def add(self, proxy, latency: float | None = None):
+        """
+        English: Adds a proxy ('ip:port' or (ip, port)) to the pool.
+
+        Português (brasileiro): Adiciona um proxy ('ip:porta' ou (ip, porta)) ao conjunto.
+        """
+        import heapq
+        import time
+
+        ip, port = _split_proxy(proxy)
+        key = f'{ip}:{port}'
+        stats = {
+            'proxy': key,
+            'success': 1.0,
+            'latency': latency or self._DEFAULT_LATENCY,
+            'failures': 0,
+            'checked': time.monotonic()
+        }
+        with self._lock:
+            if key in self._slots:
+                return
+            if self._free:
+                index = self._free.pop()
+                self._stats[index] = stats
+                self._tree.set(index, self._weight(stats))
+            else:
+                index = self._tree.append(self._weight(stats))
+                self._stats.append(stats)
+            self._slots[key] = index
+            if self._checks is not None:
+                heapq.heappush(self._checks, (stats['checked'], key))
+
+    def remove(self, proxy):
+        """
+        English: Removes a proxy from the pool, if present.
+
+        Português (brasileiro): Remove um proxy do conjunto, se presente.
+        """
+        ip, port = _split_proxy(proxy)
+        with self._lock:
+            index = self._slots.pop(f'{ip}:{port}', None)
+            if index is not None:
+                self._tree.set(index, 0.0)
+                self._stats[index] = None
+                self._free.append(index)
+
+    def get(self) -> str:
+        """
+        English: Picks a proxy ('ip:port'), weighted by its health.
+
+        Português (brasileiro): Sorteia um proxy ('ip:porta'), com peso proporcional à sua saúde.
+        """
+        import random
+
+        with self._lock:
+            if not self._slots:
+                raise ValueError('Nenhum proxy disponível no conjunto')
+            total = self._tree.total()
+            index = self._tree.find(random.random() * total)
+            if self._stats[index] is None:
+                self._tree.rebuild()
+                index = self._tree.find(random.random() * self._tree.total())
+                if self._stats[index] is None:
+                    index = next(iter(self._slots.values()))
+            return self._stats[index]['proxy']
+
+    def report(self, proxy, success: bool, latency: float | None = None):
+        """
+        English: Records the result of a request made through a proxy, updating its weight or removing it after `max_failures` consecutive failures.
+
+        Português (brasileiro): Registra o resultado de uma requisição feita por um proxy, atualizando seu peso ou removendo-o após `max_failures` falhas consecutivas.
+        """
+        ip, port = _split_proxy(proxy)
+        key = f'{ip}:{port}'
+        alpha = self.smoothing
+        with self._lock:
+            index = self._slots.get(key)
+            if index is None:
+                return
+            stats = self._stats[index]
+            stats['success'] = (1 - alpha) * stats['success'] + alpha * success
+            if success:
+                stats['failures'] = 0
+                if latency is not None:
+                    stats['latency'] = ((1 - alpha) * stats['latency'] +
+                                        alpha * latency)
+            else:
+                stats['failures'] += 1
+            removed = stats['failures'] >= self.max_failures
+            if not removed:
+                self._tree.set(index, self._weight(stats))
+                self._updates += 1
+                if self._updates >= len(self._tree):
+                    self._tree.rebuild()
+                    self._updates = 0
+        if removed:
+            self.remove(key)
+
+    def stats(self) -> list:
+        """
+        English: Returns the health data of each proxy in the pool.
+
+        Português (brasileiro): Retorna os dados de saúde de cada proxy do conjunto.
+        """
+        with self._lock:
+            return [dict(self._stats[index]) for index in self._slots.values()]
+
+    def _due_check(self):
+        """Pops the proxy checked longest ago from the heap of check times if
+        it is due for revalidation, in O(log n) amortized. Entries of removed
+        proxies, or of proxies checked again since, are dropped on the way."""
+        import heapq
+        import time
+
+        with self._lock:
+            while self._checks:
+                checked, proxy = self._checks[0]
+                index = self._slots.get(proxy)
+                if index is None or self._stats[index]['checked'] != checked:
+                    heapq.heappop(self._checks)
+                    continue
+                if time.monotonic() - checked < self.revalidate_interval:
+                    return None
+                heapq.heappop(self._checks)
+                return proxy
+        return None
+
+    def _revalidate(self, period: float):
+        import asyncio
+        import heapq
+        import ssl
+        import time
+
+        ssl_context = ssl.create_default_context()
+        while not self._stop.wait(period):
+            proxy = self._due_check()
+            if proxy is None:
+                continue
+            ip, port = _split_proxy(proxy)
+            result = asyncio.run(
+                _probe_proxy(ip, port, self.echo_url, self.timeout,
+                             ssl_context))
+            with self._lock:
+                index = self._slots.get(proxy)
+                if index is not None:
+                    checked = time.monotonic()
+                    self._stats[index]['checked'] = checked
+                    heapq.heappush(self._checks, (checked, proxy))
+            self.report(proxy, result['valid'], result['latency'])
+
+    def close(self):
+        """
+        English: Stops the background revalidation thread.
+
+        Português (brasileiro): Interrompe a thread de revalidação em segundo plano.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, proxy) -> bool:
+        ip, port = _split_proxy(proxy)
+        return f'{ip}:{port}' in self._slots